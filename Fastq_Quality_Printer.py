@@ -5,24 +5,48 @@
 #
 # Output location: standard out
 #
-# Usage: ./Fastq_Quality_Printer.py -1 path_to_R1 -2 path_to_R2
+# Usage: ./Fastq_Quality_Printer.py -1 path_to_R1[.gz] -2 path_to_R2[.gz] [-t threads] [-j histograms.json] [-e auto|python|numpy]
 #
-# Modules required: None
+# Modules required: None (numpy is used for the vectorized engine when available)
 #
-# v1.0 (10/3/2019)
+# v1.1 (10/18/2026)
 #
 # Created by Rich Stanton (njr5@cdc.gov)
 #
 
+import os
+import io
 import sys
+import json
+import gzip
+import shutil
 import argparse
+import subprocess
+import multiprocessing
+from array import array
 from decimal import *
 getcontext().prec = 4
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+# Number of bytes of lines read per block by the counting engines
+BLOCK_SIZE = 16 * 1024 * 1024
+# Buffer size used between a decompressor (or stdin) and the block reader
+STREAM_BUFFER = 4 * 1024 * 1024
+# Number of phred score bins (0 to 93) kept per cycle in the quality histograms
+QUALITY_BINS = 94
+# Parallel gzip decompressors to try, in order, before falling back to the gzip module
+DECOMPRESSORS = ['igzip', 'pigz']
 
 def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to count quality metrics from paired fastq files')
-	parser.add_argument('-1', '--r1', required=True, help='input R1 filename')
-	parser.add_argument('-2', '--r2', required=True, help='input R2 filename')
+	parser.add_argument('-1', '--r1', required=True, help='input R1 filename (plain, gzip or bgzip, - for stdin)')
+	parser.add_argument('-2', '--r2', required=True, help='input R2 filename (plain, gzip or bgzip, - for stdin)')
+	parser.add_argument('-t', '--threads', type=int, default=1, help='number of worker processes, R1 and R2 are counted concurrently and split into chunks when above 1 (default: 1)')
+	parser.add_argument('-j', '--histograms', help='also write per cycle quality and read length histograms of both mates to this json file')
+	parser.add_argument('-e', '--engine', default='auto', choices=['auto', 'python', 'numpy'], help='counting engine to use, auto picks numpy if it is installed (default: auto)')
 	return parser.parse_args()
 
 
@@ -40,65 +64,240 @@ def Q30(input_string):
             Q30_Total = Q30_Total + 1
     return Q30_Total
 
-def Quality_Score(input_fastq):
-    f= open(input_fastq, 'r')
+# Checks for the gzip magic number, which bgzip files share
+def Is_Gzipped(input_fastq):
+    if input_fastq == '-':
+        return False
+    f = open(input_fastq, 'rb')
+    Magic = f.read(2)
+    f.close()
+    return Magic == b'\x1f\x8b'
+
+# Plain files on disk can be split into byte ranges, streams cannot
+def Is_Splittable(input_fastq):
+    return input_fastq != '-' and os.path.isfile(input_fastq) and not Is_Gzipped(input_fastq)
+
+# Opens a fastq for binary reading. Returns the handle and the decompressor process (or None) so both can be closed
+def Open_Fastq(input_fastq):
+    if input_fastq == '-':
+        return io.BufferedReader(sys.stdin.buffer.raw, STREAM_BUFFER), None
+    if Is_Gzipped(input_fastq):
+        for tool in DECOMPRESSORS:
+            if shutil.which(tool):
+                Process = subprocess.Popen([tool, '-dc', input_fastq], stdout=subprocess.PIPE, bufsize=STREAM_BUFFER)
+                return Process.stdout, Process
+        return io.BufferedReader(gzip.open(input_fastq, 'rb'), STREAM_BUFFER), None
+    return open(input_fastq, 'rb'), None
+
+# Yields blocks of lines from a fastq, stopping at the end offset (which must fall on a record start)
+def Line_Blocks(input_fastq, start=0, end=None, block_size=BLOCK_SIZE):
+    f, Process = Open_Fastq(input_fastq)
+    if start > 0:
+        f.seek(start)
+    Position = start
+    Lines = f.readlines(block_size)
+    while Lines:
+        if end is not None:
+            for i in range(len(Lines)):
+                if Position >= end:
+                    Lines = Lines[0:i]
+                    break
+                Position = Position + len(Lines[i])
+        if Lines:
+            yield Lines
+        if end is not None and Position >= end:
+            break
+        Lines = f.readlines(block_size)
+    if input_fastq != '-':
+        f.close()
+    if Process is not None:
+        Process.wait()
+        if Process.returncode not in [0, -13]:
+            sys.exit('Decompressing ' + input_fastq + ' failed with exit code ' + str(Process.returncode))
+
+# Counts Q20, Q30, bases and reads in a fastq one character at a time. When histograms is set the per cycle
+# quality counts and read length counts are also returned, otherwise the last item is None
+def Python_Counts(input_fastq, start=0, end=None, histograms=False):
     Q20_Total = 0
     Q30_Total = 0
     Total_Bases = 0
     Total_Reads = 0
-    String1 = f.readline()
-    while String1 != '':
-        if String1 == '+\n':
-            Total_Reads = Total_Reads + 1
-            String1 = f.readline()
-            Q20_Total = Q20_Total + Q20(String1[0:-1])
-            Q30_Total = Q30_Total + Q30(String1[0:-1])
-            Total_Bases = Total_Bases + len(String1[0:-1])
-            String1 = f.readline()
-        else:
-            String1 = f.readline()
-    print('Total Reads: ' + str(Total_Reads))
-    print('Total Bases: ' + str(Total_Bases))
-    print('Q20 Bases: ' + str(Q20_Total))
-    print('Q30 Bases: ' + str(Q30_Total))
-    print('Q20 %: ' + str(float(Q20_Total) / Total_Bases))
-    print('Q30 %: ' + str(float(Q30_Total) / Total_Bases))
+    Cycle_Counts = []
+    Length_Counts = []
+    Quality_Line = False
+    for Lines in Line_Blocks(input_fastq, start, end):
+        for String1 in Lines:
+            if Quality_Line:
+                Quality = String1[0:-1].rstrip(b'\r').decode('latin-1')
+                Total_Reads = Total_Reads + 1
+                Q20_Total = Q20_Total + Q20(Quality)
+                Q30_Total = Q30_Total + Q30(Quality)
+                Total_Bases = Total_Bases + len(Quality)
+                if histograms:
+                    while len(Length_Counts) <= len(Quality):
+                        Length_Counts.append(0)
+                    Length_Counts[len(Quality)] = Length_Counts[len(Quality)] + 1
+                    while len(Cycle_Counts) < len(Quality):
+                        Cycle_Counts.append(array('Q', bytes(8 * QUALITY_BINS)))
+                    for i in range(len(Quality)):
+                        Cycle_Counts[i][min(max(ord(Quality[i]) - 33, 0), QUALITY_BINS - 1)] += 1
+                Quality_Line = False
+            elif String1.startswith(b'+'):
+                Quality_Line = True
+    Histograms = None
+    if histograms:
+        Histograms = ([list(Row) for Row in Cycle_Counts], Length_Counts)
+    return Q20_Total, Q30_Total, Total_Bases, Total_Reads, Histograms
+
+# Counts Q20, Q30, bases and reads in a fastq by joining each block of quality lines into one array.
+# Histograms are filled with one bincount per block over (cycle, phred) pairs
+def Numpy_Counts(input_fastq, start=0, end=None, histograms=False):
+    Q20_Total = 0
+    Q30_Total = 0
+    Total_Bases = 0
+    Total_Reads = 0
+    Cycle_Counts = np.zeros((0, QUALITY_BINS), dtype=np.int64)
+    Length_Counts = np.zeros(0, dtype=np.int64)
+    Quality_Line = False
+    for Lines in Line_Blocks(input_fastq, start, end):
+        Qualities = []
+        for String1 in Lines:
+            if Quality_Line:
+                Qualities.append(String1[0:-1].rstrip(b'\r'))
+                Quality_Line = False
+            elif String1.startswith(b'+'):
+                Quality_Line = True
+        if Qualities:
+            Scores = np.frombuffer(b''.join(Qualities), dtype=np.uint8)
+            Total_Reads = Total_Reads + len(Qualities)
+            Q20_Total = Q20_Total + int(np.count_nonzero(Scores >= 20 + 33))
+            Q30_Total = Q30_Total + int(np.count_nonzero(Scores >= 30 + 33))
+            Total_Bases = Total_Bases + Scores.size
+            if histograms:
+                Lengths = np.fromiter(map(len, Qualities), dtype=np.int64, count=len(Qualities))
+                Cycles = np.arange(Scores.size, dtype=np.int64) - np.repeat(np.cumsum(Lengths) - Lengths, Lengths)
+                Phreds = np.clip(Scores.astype(np.int64) - 33, 0, QUALITY_BINS - 1)
+                Longest = int(Lengths.max())
+                Block_Counts = np.bincount(Cycles * QUALITY_BINS + Phreds, minlength=Longest * QUALITY_BINS).reshape(Longest, QUALITY_BINS)
+                if Longest > Cycle_Counts.shape[0]:
+                    Cycle_Counts = np.vstack([Cycle_Counts, np.zeros((Longest - Cycle_Counts.shape[0], QUALITY_BINS), dtype=np.int64)])
+                Cycle_Counts[0:Longest] += Block_Counts
+                Block_Lengths = np.bincount(Lengths)
+                if Block_Lengths.size > Length_Counts.size:
+                    Length_Counts = np.concatenate([Length_Counts, np.zeros(Block_Lengths.size - Length_Counts.size, dtype=np.int64)])
+                Length_Counts[0:Block_Lengths.size] += Block_Lengths
+    Histograms = None
+    if histograms:
+        Histograms = (Cycle_Counts.tolist(), Length_Counts.tolist())
+    return Q20_Total, Q30_Total, Total_Bases, Total_Reads, Histograms
+
+# Picks the counting function for the requested engine
+def Counter(engine='auto'):
+    if engine == 'numpy' or (engine == 'auto' and np is not None):
+        if np is None:
+            sys.exit('numpy engine requested but numpy is not installed')
+        return Numpy_Counts
+    return Python_Counts
 
-def Quality_Score_2_Reads(fastq1, fastq2, output_file):
-    Q20_Total_1 = 0
-    Q30_Total_1 = 0
-    Total_Bases_1 = 0
-    Total_Reads_1 = 0
-    f = open(fastq1, 'r')
+# Finds the offset of the first fastq record at or after offset. A record is recognised by an @ header
+# whose third line starts with + and whose sequence and quality lines are the same length
+def Record_Start(input_fastq, offset):
+    if offset <= 0:
+        return 0
+    f = open(input_fastq, 'rb')
+    f.seek(offset - 1)
+    Position = offset - 1 + len(f.readline())
+    Window = []
+    Offsets = []
     String1 = f.readline()
-    while String1 != '':
-        if String1 == '+\n':
-            Total_Reads_1 = Total_Reads_1 + 1
-            String1 = f.readline()
-            Q20_Total_1 = Q20_Total_1 + Q20(String1[0:-1])
-            Q30_Total_1 = Q30_Total_1 + Q30(String1[0:-1])
-            Total_Bases_1 = Total_Bases_1 + len(String1[0:-1])
-            String1 = f.readline()
-        else:
-            String1 = f.readline()
+    while String1 != b'':
+        Window.append(String1)
+        Offsets.append(Position)
+        Position = Position + len(String1)
+        if len(Window) == 4:
+            if Window[0].startswith(b'@') and Window[2].startswith(b'+') and len(Window[1].rstrip()) == len(Window[3].rstrip()):
+                f.close()
+                return Offsets[0]
+            Window.pop(0)
+            Offsets.pop(0)
+        String1 = f.readline()
     f.close()
-    Q20_Total_2 = 0
-    Q30_Total_2 = 0
-    Total_Bases_2 = 0
-    Total_Reads_2 = 0
-    g = open(fastq2, 'r')
-    String1 = g.readline()
-    while String1 != '':
-        if String1 == '+\n':
-            Total_Reads_2 = Total_Reads_2 + 1
-            String1 = g.readline()
-            Q20_Total_2 = Q20_Total_2 + Q20(String1[0:-1])
-            Q30_Total_2 = Q30_Total_2 + Q30(String1[0:-1])
-            Total_Bases_2 = Total_Bases_2 + len(String1[0:-1])
-            String1 = g.readline()
+    return Position
+
+# Splits a fastq into byte ranges that each begin on a record start. Streams are always a single range
+def Chunk_Offsets(input_fastq, chunks):
+    if not Is_Splittable(input_fastq):
+        return [(0, None)]
+    Size = os.path.getsize(input_fastq)
+    Starts = [0]
+    for i in range(1, chunks):
+        Start = Record_Start(input_fastq, Size * i // chunks)
+        if Start > Starts[-1] and Start < Size:
+            Starts.append(Start)
+    Ends = Starts[1:] + [None]
+    return list(zip(Starts, Ends))
+
+# Pool worker that counts one byte range of one fastq
+def Count_Chunk(job):
+    engine, input_fastq, start, end, histograms = job
+    return Counter(engine)(input_fastq, start, end, histograms)
+
+# Adds two lists of counts (or lists of count rows) of possibly different lengths
+def Add_Lists(List1, List2):
+    if len(List1) < len(List2):
+        List1, List2 = List2, List1
+    Merged = list(List1)
+    for i in range(len(List2)):
+        if isinstance(List2[i], list):
+            Merged[i] = Add_Lists(Merged[i], List2[i])
         else:
-            String1 = g.readline()
-    g.close()
+            Merged[i] = Merged[i] + List2[i]
+    return Merged
+
+# Sums a list of (Q20, Q30, bases, reads, histograms) counters
+def Merge_Counts(Counts_List):
+    Merged = [sum(Counts[i] for Counts in Counts_List) for i in range(4)]
+    Histograms = None
+    for Counts in Counts_List:
+        if Counts[4] is not None:
+            if Histograms is None:
+                Histograms = Counts[4]
+            else:
+                Histograms = (Add_Lists(Histograms[0], Counts[4][0]), Add_Lists(Histograms[1], Counts[4][1]))
+    return tuple(Merged) + (Histograms,)
+
+# Counts both mates of a pair, splitting the files across threads worker processes when threads > 1
+def Paired_Counts(fastq1, fastq2, engine='auto', threads=1, histograms=False):
+    if fastq1 == '-' and fastq2 == '-':
+        sys.exit('Only one of R1 and R2 can be read from stdin')
+    if threads <= 1:
+        Counts = Counter(engine)
+        return Counts(fastq1, histograms=histograms), Counts(fastq2, histograms=histograms)
+    # Fail on a missing engine here rather than inside every worker
+    Counter(engine)
+    Chunks = max(1, threads // 2)
+    Jobs_1 = [(engine, fastq1, start, end, histograms) for start, end in Chunk_Offsets(fastq1, Chunks)]
+    Jobs_2 = [(engine, fastq2, start, end, histograms) for start, end in Chunk_Offsets(fastq2, Chunks)]
+    # Worker processes do not inherit stdin, so a stdin mate is counted here while the pool handles the other
+    Pool_Jobs = [Job for Job in Jobs_1 + Jobs_2 if Job[1] != '-']
+    Pool = multiprocessing.Pool(max(1, min(threads, len(Pool_Jobs))))
+    Pending = Pool.map_async(Count_Chunk, Pool_Jobs)
+    Stdin_Counts = [Count_Chunk(Job) for Job in Jobs_1 + Jobs_2 if Job[1] == '-']
+    Pool_Counts = Pending.get()
+    Pool.close()
+    Pool.join()
+    Results = []
+    for Job in Jobs_1 + Jobs_2:
+        if Job[1] == '-':
+            Results.append(Stdin_Counts.pop(0))
+        else:
+            Results.append(Pool_Counts.pop(0))
+    return Merge_Counts(Results[0:len(Jobs_1)]), Merge_Counts(Results[len(Jobs_1):])
+
+# Formats the tab delimited counts line shared by Quality_Score_2_Reads and Quality_Score_Printer
+def Quality_Line_Maker(fastq1, Counts_1, Counts_2):
+    Q20_Total_1, Q30_Total_1, Total_Bases_1, Total_Reads_1 = Counts_1[0:4]
+    Q20_Total_2, Q30_Total_2, Total_Bases_2, Total_Reads_2 = Counts_2[0:4]
     Total_Reads = str(Total_Reads_1 + Total_Reads_2)
     Total_Bases = str(Total_Bases_1 + Total_Bases_2)
     Q20_Total = str(Q20_Total_1 + Q20_Total_2)
@@ -107,56 +306,51 @@ def Quality_Score_2_Reads(fastq1, fastq2, output_file):
     Q20_R2 = str(Decimal(Q20_Total_2) / Decimal(Total_Bases_2))
     Q30_R1 = str(Decimal(Q30_Total_1) / Decimal(Total_Bases_1))
     Q30_R2 = str(Decimal(Q30_Total_2) / Decimal(Total_Bases_2))
+    return fastq1 + '\t' + Q20_Total + '\t' + Q30_Total + '\t' + str(Q20_Total_1) + '\t' + str(Q20_Total_2) + '\t' + Q20_R1 + '\t' + Q20_R2 + '\t' + str(Q30_Total_1) + '\t' + str(Q30_Total_2) + '\t' + Q30_R1 + '\t' + Q30_R2+ '\t' + Total_Bases + '\t' + Total_Reads
+
+def Quality_Score(input_fastq, engine='auto'):
+    Q20_Total, Q30_Total, Total_Bases, Total_Reads = Counter(engine)(input_fastq)[0:4]
+    print('Total Reads: ' + str(Total_Reads))
+    print('Total Bases: ' + str(Total_Bases))
+    print('Q20 Bases: ' + str(Q20_Total))
+    print('Q30 Bases: ' + str(Q30_Total))
+    print('Q20 %: ' + str(float(Q20_Total) / Total_Bases))
+    print('Q30 %: ' + str(float(Q30_Total) / Total_Bases))
+
+# Writes the per cycle quality and read length histograms of both mates as a json sidecar.
+# quality_by_cycle[cycle][phred] counts bases, length_counts[length] counts reads
+def Histogram_Writer(fastq1, fastq2, Counts_1, Counts_2, output_file):
+    Sidecar = {}
+    for Mate, fastq, Counts in [('R1', fastq1, Counts_1), ('R2', fastq2, Counts_2)]:
+        Cycle_Counts, Length_Counts = Counts[4]
+        # Drop phred columns above the highest score seen so the file stays small
+        Highest = 0
+        for Row in Cycle_Counts:
+            for i in range(len(Row) - 1, Highest, -1):
+                if Row[i] != 0:
+                    Highest = i
+                    break
+        Sidecar[Mate] = {'file': fastq, 'reads': Counts[3], 'bases': Counts[2], 'phred_offset': 33, 'quality_by_cycle': [Row[0:Highest + 1] for Row in Cycle_Counts], 'length_counts': Length_Counts}
     h = open(output_file, 'w')
-    h.write(fastq1 + '\t' + Q20_Total + '\t' + Q30_Total + '\t' + str(Q20_Total_1) + '\t' + str(Q20_Total_2) + '\t' + Q20_R1 + '\t' + Q20_R2 + '\t' + str(Q30_Total_1) + '\t' + str(Q30_Total_2) + '\t' + Q30_R1 + '\t' + Q30_R2+ '\t' + Total_Bases + '\t' + Total_Reads)
+    json.dump(Sidecar, h)
+    h.write('\n')
     h.close()
 
-def Quality_Score_Printer(fastq1, fastq2):
-    Q20_Total_1 = 0
-    Q30_Total_1 = 0
-    Total_Bases_1 = 0
-    Total_Reads_1 = 0
-    f = open(fastq1, 'r')
-    String1 = f.readline()
-    while String1 != '':
-        if String1.startswith('+'):
-            Total_Reads_1 = Total_Reads_1 + 1
-            String1 = f.readline()
-            Q20_Total_1 = Q20_Total_1 + Q20(String1[0:-1])
-            Q30_Total_1 = Q30_Total_1 + Q30(String1[0:-1])
-            Total_Bases_1 = Total_Bases_1 + len(String1[0:-1])
-            String1 = f.readline()
-        else:
-            String1 = f.readline()
-    f.close()
-    Q20_Total_2 = 0
-    Q30_Total_2 = 0
-    Total_Bases_2 = 0
-    Total_Reads_2 = 0
-    g = open(fastq2, 'r')
-    String1 = g.readline()
-    while String1 != '':
-        if String1.startswith('+'):
-            Total_Reads_2 = Total_Reads_2 + 1
-            String1 = g.readline()
-            Q20_Total_2 = Q20_Total_2 + Q20(String1[0:-1])
-            Q30_Total_2 = Q30_Total_2 + Q30(String1[0:-1])
-            Total_Bases_2 = Total_Bases_2 + len(String1[0:-1])
-            String1 = g.readline()
-        else:
-            String1 = g.readline()
-    g.close()
-    Total_Reads = str(Total_Reads_1 + Total_Reads_2)
-    Total_Bases = str(Total_Bases_1 + Total_Bases_2)
-    Q20_Total = str(Q20_Total_1 + Q20_Total_2)
-    Q30_Total = str(Q30_Total_1 + Q30_Total_2)
-    Q20_R1 = str(Decimal(Q20_Total_1) / Decimal(Total_Bases_1))
-    Q20_R2 = str(Decimal(Q20_Total_2) / Decimal(Total_Bases_2))
-    Q30_R1 = str(Decimal(Q30_Total_1) / Decimal(Total_Bases_1))
-    Q30_R2 = str(Decimal(Q30_Total_2) / Decimal(Total_Bases_2))
-    String1 = fastq1 + '\t' + Q20_Total + '\t' + Q30_Total + '\t' + str(Q20_Total_1) + '\t' + str(Q20_Total_2) + '\t' + Q20_R1 + '\t' + Q20_R2 + '\t' + str(Q30_Total_1) + '\t' + str(Q30_Total_2) + '\t' + Q30_R1 + '\t' + Q30_R2+ '\t' + Total_Bases + '\t' + Total_Reads
-    print(String1)
+def Quality_Score_2_Reads(fastq1, fastq2, output_file, engine='auto', threads=1, histogram_file=None):
+    Counts_1, Counts_2 = Paired_Counts(fastq1, fastq2, engine, threads, histogram_file is not None)
+    h = open(output_file, 'w')
+    h.write(Quality_Line_Maker(fastq1, Counts_1, Counts_2))
+    h.close()
+    if histogram_file is not None:
+        Histogram_Writer(fastq1, fastq2, Counts_1, Counts_2, histogram_file)
+
+def Quality_Score_Printer(fastq1, fastq2, engine='auto', threads=1, histogram_file=None):
+    Counts_1, Counts_2 = Paired_Counts(fastq1, fastq2, engine, threads, histogram_file is not None)
+    print(Quality_Line_Maker(fastq1, Counts_1, Counts_2))
+    if histogram_file is not None:
+        Histogram_Writer(fastq1, fastq2, Counts_1, Counts_2, histogram_file)
 
 
-args = parseArgs()
-Quality_Score_Printer(args.r1, args.r2)
+if __name__ == '__main__':
+    args = parseArgs()
+    Quality_Score_Printer(args.r1, args.r2, args.engine, args.threads, args.histograms)
@@ -3,14 +3,15 @@
 #
 # Description: Script to find AR genes, nucleotide and AA with differences, within fasta assembly
 #
-# Usage: python GAMA_ResGANNCBI_SciComp_Exe.py -i my_scaffolds.fasta -d NAR.fasta -o My_output.GAMA
+# Usage: python GAMA_ResGANNCBI_SciComp_Exe.py -i my_scaffolds.fasta -d NAR.fasta -o My_output.GAMA [-s [--debug]] [-t threads]
+#	Batch: python GAMA_ResGANNCBI_SciComp_Exe.py -l list_of_assemblies -d NAR.fasta [-j concurrent_blat_searches] [-t threads] [--debug]
 #   ** Requires python2, working on converting to py3
 #
 # Output location: parameter
 #
-# Modules required: Biopython must be available in python instance
+# Modules required: Biopython and numpy must be available in python instance
 #
-# v1.0.7 (1/06/2020) (Eq. to 4.7.5)
+# v1.0.8 (10/18/2026) (Eq. to 4.7.5)
 #
 # Created by Rich Stanton (njr5@cdc.gov)
 #
@@ -30,6 +31,14 @@ from decimal import *
 getcontext().prec = 4
 import math
 import argparse
+import bisect
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from multiprocessing.pool import ThreadPool
+from translate_utils import translateSeq
 
 ##Written by Rich Stantn (njr5@cdc.gov)
 ##Requires Python/2.7.3 and blat
@@ -39,10 +48,19 @@ print (sys.version)
 
 def parseArgs(args=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument('-i', '--input', help='input file', required=True, dest='input')
-    parser.add_argument('-o', '--output', help='output file name.GAMA', required=True, dest='output')
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('-i', '--input', help='input file', dest='input')
+    inputs.add_argument('-l', '--list', help='batch mode, file listing assemblies one per line, each optionally followed by a tab and the output name.GAMA', dest='list')
+    parser.add_argument('-o', '--output', help='output file name.GAMA (required with -i)', dest='output')
     parser.add_argument('-d', '--database', help='database location', required=True, dest='database')
-    return parser.parse_args()
+    parser.add_argument('-s', '--stream', help='read blat PSL from a pipe while blat runs instead of from name.GAMA.psl', action='store_true', dest='stream')
+    parser.add_argument('--debug', help='with -s, also keep the PSL as name.GAMA.psl', action='store_true', dest='debug')
+    parser.add_argument('-t', '--threads', help='number of worker processes to type hits with, hits are split by contig (default: 1)', type=int, default=1, dest='threads')
+    parser.add_argument('-j', '--jobs', help='number of blat searches to run at once in batch mode (default: 1)', type=int, default=1, dest='jobs')
+    args = parser.parse_args()
+    if args.input is not None and args.output is None:
+        parser.error('-o/--output is required with -i/--input')
+    return args
 
 def PSL_Type(PSL_Line):
     #print("pre1")
@@ -64,11 +82,13 @@ def PSL_Type(PSL_Line):
         Type = 'Mutant'
     return Type
 
-def Indel_Sum(PSL_Line):
+def Indel_Sum(PSL_Line, Base_Info=None):
     #print("pre2")
-    """Returns the sum of the indels (+1 for insertions, -1 for deletions)"""
+    """Returns the sum of the indels (+1 for insertions, -1 for deletions), from Base_Info if already made"""
     Count = 0
-    Indels = Indel_Base_Info(PSL_Line)
+    Indels = Base_Info
+    if Indels is None:
+        Indels = Indel_Base_Info(PSL_Line)
     for indels in Indels:
         if indels[0] == 'Insertion':
             Count = Count + indels[1]
@@ -127,15 +147,16 @@ def Genome_Region_Extractor(PSL_Line, genome):
         gene = gene[Positions[0]:Positions[1]]
     return gene
 
-def Indel_Typer(PSL_Line, genome_gene, gene):
+def Indel_Typer(PSL_Line, genome_gene, gene, Comparison=None):
     #print("pre7")
-    """Determines the type of Indel"""
-    gene_pro = str(gene.seq.translate())
-    genome_pro = str(genome_gene.seq.translate())
-    for bases in genome_pro[0:-1]:
-        if bases == '*':
-            Type = 'Indel Truncation'
-            return Type
+    """Determines the type of Indel, from Comparison (an Indel_Comparison or Region_Comparison) if it has already been made"""
+    if Comparison is None:
+        Comparison = Region_Comparison(genome_gene, gene)
+    gene_pro = Comparison.gene_pro
+    genome_pro = Comparison.genome_pro
+    if Comparison.Internal_Stop():
+        Type = 'Indel Truncation'
+        return Type
     if genome_pro[-1] != '*' and gene_pro[-1] == '*':
         Type = 'Indel Nonstop'
         return Type
@@ -154,22 +175,25 @@ def N_Counter(input_gene):
             Count = Count + 1
     return Count
 
-def Truncation_Location(genome_gene):
+def Truncation_Location(genome_gene, Comparison=None):
     #print("pre9")
-    genome_pro = str(genome_gene.seq.translate())
-    for positions in range(len(genome_pro)):
-        if genome_pro[positions] == '*':
-            return positions
+    """Codon index of the first stop in the genome gene, from Comparison (a Region_Comparison) if it has already been made"""
+    if Comparison is not None:
+        return Comparison.Truncation_Location()
+    genome_pro = Protein(genome_gene)
+    if '*' in genome_pro:
+        return genome_pro.index('*')
 
-def Mutant_Typer(PSL_Line, genome_gene, gene):
+def Mutant_Typer(PSL_Line, genome_gene, gene, Comparison=None):
     #print("pre10")
     """Determines the type of Indel"""
-    gene_pro = str(gene.seq.translate())
-    genome_pro = str(genome_gene.seq.translate())
-    for bases in genome_pro[0:-1]:
-        if bases == '*':
-            Type = 'Truncation'
-            return Type
+    if Comparison is None:
+        Comparison = Region_Comparison(genome_gene, gene)
+    gene_pro = Comparison.gene_pro
+    genome_pro = Comparison.genome_pro
+    if Comparison.Internal_Stop():
+        Type = 'Truncation'
+        return Type
     if genome_pro[-1] != '*' and gene_pro[-1] == '*':
         Type = 'Nonstop'
         return Type
@@ -190,11 +214,12 @@ def Is_Partial(PSL_Line):
     else:
         return False
 
-def Indel_Base_Info(PSL_Line):
+def Indel_Base_Info(PSL_Line, Blocks=None):
     #print("pre12")
-    """Makes a list of Indel lengths and types from a PSL line"""
-    Start_Stops_Blocks = Match_Start_Stop_Finder(PSL_Line)
-    List1 = PSL_Line.split('\t')
+    """Makes a list of Indel lengths and types from a PSL line, from its Match_Start_Stop_Finder Blocks if already found"""
+    if Blocks is None:
+        Blocks = Match_Start_Stop_Finder(PSL_Line)
+    Start_Stops_Blocks = Blocks
     Lengths = Start_Stops_Blocks[2]
     Genome_Starts = Start_Stops_Blocks[3]
     Gene_Starts = Start_Stops_Blocks[4]
@@ -215,76 +240,48 @@ def Indel_Base_Info(PSL_Line):
             Output.append(Block)
     return Output
 
-def Indel_Base_Output(PSL_Line):
+def Indel_Base_Output(PSL_Line, Base_Info=None):
     #print("pre13")
-    """Makes a readable output from Indel Info"""
-    Info_List = Indel_Base_Info(PSL_Line)
+    """Makes a readable output from Indel Info, given as Base_Info if already made"""
+    if Base_Info is None:
+        Base_Info = Indel_Base_Info(PSL_Line)
     Output = ''
-    for entries in Info_List:
+    for entries in Base_Info:
         Info = str(entries[1]) + ' bp ' + entries[0] + ' at ' + str(entries[2] + 1) + ','
         Output = Output + Info
     return Output
 
-def Indel_BP_Count(PSL_Line, genome_gene, gene):
-    #print("pre14")
-    """Makes a count of mutants and indels"""
-    genome_gene = str(genome_gene.seq)
-    gene = str(gene.seq)
-    List1 = PSL_Line.split('\t')
-    Length = len(gene)
-    Base_Info = Indel_Base_Info(PSL_Line)
+def Indel_Base_Blocks(Base_Info, genome_gene, gene):
+    """Splits the genome and gene sequences at the indels in Base_Info. Returns [genome block, gene block] for each block"""
+    Blocks = []
     Start = 0
-    Count = 0
     Offset = 0
     for entries in Base_Info:
-        Block_Difference = Mutant_Count(genome_gene[Start + Offset:entries[2] + Offset], gene[Start:entries[2]])
-        Count = Count + Block_Difference
+        Blocks.append([genome_gene[Start + Offset:entries[2] + Offset], gene[Start:entries[2]]])
         if entries[0] == 'Deletion':
             Offset = Offset - entries[1]
-            Count = Count + entries[1]
             Start = entries[2] + Offset
         elif entries[0] == 'Insertion':
             Offset = Offset + entries[1]
-            Count = Count + entries[1]
             Start = entries[2] + Offset
-    Block_Difference = Mutant_Count(genome_gene[entries[2] + Offset:], gene[entries[2]:])
-    Count = Count + Block_Difference
-    return Count
+    Blocks.append([genome_gene[Base_Info[-1][2] + Offset:], gene[Base_Info[-1][2]:]])
+    return Blocks
+
+def Indel_BP_Count(PSL_Line, genome_gene, gene):
+    #print("pre14")
+    """Makes a count of mutants and indels"""
+    return Indel_Comparison(PSL_Line, genome_gene, gene).bp_changes
 
 def Indel_Transversion_Count(PSL_Line, genome_gene, gene):
     #print("pre15")
     """Makes a count of transversions"""
-    genome_gene = str(genome_gene.seq)
-    gene = str(gene.seq)
-    List1 = PSL_Line.split('\t')
-    Length = len(gene)
-    Base_Info = Indel_Base_Info(PSL_Line)
-    Start = 0
-    Count = 0
-    Offset = 0
-    for entries in Base_Info:
-        Block_Difference = Transversion_Count(genome_gene[Start + Offset:entries[2] + Offset], gene[Start:entries[2]])
-        Count = Count + Block_Difference
-        if entries[0] == 'Deletion':
-            Offset = Offset - entries[1]
-            Start = entries[2] + Offset
-        elif entries[0] == 'Insertion':
-            Offset = Offset + entries[1]
-            Start = entries[2] + Offset
-    Block_Difference = Transversion_Count(genome_gene[entries[2] + Offset:], gene[entries[2]:])
-    Count = Count + Block_Difference
-    return Count
+    return Indel_Comparison(PSL_Line, genome_gene, gene).transversions
 
-def Indel_Codon_Count(PSL_Line, genome_gene, gene):
-    #print("pre16")
-    """Makes a count of mutants and indels"""
-    List1 = PSL_Line.split('\t')
-    Length = len(gene)
-    Base_Info = Indel_Base_Info(PSL_Line)
-    genome_pro  = str(genome_gene.seq.translate())
-    gene_pro = str(gene.seq.translate())
+def Indel_Codon_Blocks(Base_Info, genome_pro, gene_pro):
+    """Splits the genome and gene translations at the indels in Base_Info that restore the frame. Returns [genome block,
+    gene block, first codon, codons inserted (+) or deleted (-) so far] for each block, the codons of the last block are not added"""
+    Blocks = []
     Start = 0
-    Count = 0
     Offset = 0
     Codon = 0
     Codon_Difference = 0
@@ -296,73 +293,27 @@ def Indel_Codon_Count(PSL_Line, genome_gene, gene):
         if Offset != 0 and Offset % 3 == 0:
             Codon = math.ceil(entries[2] / float(3)) + Codon
             Codon = int(Codon)
-            Block_Difference = Mutant_Count(genome_pro[Start + Codon_Difference:Codon + Codon_Difference], gene_pro[Start:Codon])
+            Block = [genome_pro[Start + Codon_Difference:Codon + Codon_Difference], gene_pro[Start:Codon], Start]
             Codon_Difference = Offset // 3
-            Count = Count + Block_Difference + abs(Codon_Difference)
+            Blocks.append(Block + [Codon_Difference])
             Start = Codon
-    Block_Difference = Mutant_Count(genome_pro[Start + Codon_Difference:], gene_pro[Start:])
-    Count = Count + Block_Difference
-    return Count
+    Blocks.append([genome_pro[Start + Codon_Difference:], gene_pro[Start:], Start, 0])
+    return Blocks
+
+def Indel_Codon_Count(PSL_Line, genome_gene, gene):
+    #print("pre16")
+    """Makes a count of mutants and indels"""
+    return Indel_Comparison(PSL_Line, genome_gene, gene).Codon_Changes()
 
 def Indel_Mutant_Count(PSL_Line, genome_gene, gene):
     #print("pre17")
     """Makes a count of mutants in an indel"""
-    List1 = PSL_Line.split('\t')
-    Length = len(gene)
-    Base_Info = Indel_Base_Info(PSL_Line)
-    genome_pro  = str(genome_gene.seq.translate())
-    gene_pro = str(gene.seq.translate())
-    Start = 0
-    Count = 0
-    Offset = 0
-    Codon = 0
-    Codon_Difference = 0
-    for entries in Base_Info:
-        if entries[0] == 'Deletion':
-            Offset = Offset - entries[1]
-        elif entries[0] == 'Insertion':
-            Offset = Offset + entries[1]
-        if Offset != 0 and Offset % 3 == 0:
-            Codon = math.ceil(entries[2] / float(3)) + Codon
-            Codon = int(Codon)
-            Block_Difference = Mutant_Count(genome_pro[Start + Codon_Difference:Codon + Codon_Difference], gene_pro[Start:Codon])
-            Codon_Difference = Offset // 3
-            Count = Count + Block_Difference#+ abs(Codon_Difference)
-            Start = Codon
-    Block_Difference = Mutant_Count(genome_pro[Start + Codon_Difference:], gene_pro[Start:])
-    Count = Count + Block_Difference
-    return Count
+    return Indel_Comparison(PSL_Line, genome_gene, gene).codon_mutants
 
 def Indel_Codon_Info(PSL_Line, genome_gene, gene):
     #print("pre18")
     """Returns the mutation and indel info"""
-    List1 = PSL_Line.split('\t')
-    Length = len(gene)
-    Base_Info = Indel_Base_Info(PSL_Line)
-    genome_pro  = str(genome_gene.seq.translate())
-    gene_pro = str(gene.seq.translate())
-    Start = 0
-    Offset = 0
-    Codon = 0
-    Codon_Difference = 0
-    Info = ''
-    for entries in Base_Info:
-        if entries[0] == 'Deletion':
-            Offset = Offset - entries[1]
-        elif entries[0] == 'Insertion':
-            Offset = Offset + entries[1]
-        if Offset != 0 and Offset % 3 == 0:
-            Codon = math.ceil(entries[2] / float(3)) + Codon
-            Codon = int(Codon)
-            Mutants = Mutant_Info_Offset(genome_pro[Start + Codon_Difference:Codon + Codon_Difference], gene_pro[Start:Codon], Start)
-            Info = Info + Mutants
-            Codon_Difference = Offset // 3
-            Start = Codon
-    Mutants = Mutant_Info_Offset(genome_pro[Start + Codon_Difference:], gene_pro[Start:], Start)
-    Info = Info + Mutants
-    Indel_Info = Indel_Base_Output(PSL_Line)
-    Info = Indel_Info + Info
-    return Info
+    return Indel_Comparison(PSL_Line, genome_gene, gene).Codon_Info()
 
 def Frameshifted(PSL_Line):
     #print("pre19")
@@ -373,93 +324,208 @@ def Frameshifted(PSL_Line):
     else:
         return False
 
+# Purine and pyrimidine lookups for uppercase bases, a transversion swaps one for the other
+PURINES = np.zeros(256, dtype=bool)
+PURINES[[ord('A'), ord('G')]] = True
+PYRIMIDINES = np.zeros(256, dtype=bool)
+PYRIMIDINES[[ord('C'), ord('T')]] = True
+
+def Sequence_String(sequence):
+    """Returns the uppercase string of a sequence given as a string or SeqRecord"""
+    if hasattr(sequence, 'seq'):
+        sequence = sequence.seq
+    return str(sequence).upper()
+
+def Protein(sequence):
+    """Translates a sequence (string or SeqRecord) with the standard table, ignoring a trailing partial codon like Biopython does"""
+    sequence = Sequence_String(sequence)
+    return translateSeq(sequence[:len(sequence) - len(sequence) % 3])
+
+class Sequence_Comparison(object):
+    """Comparison kernel: lines up a mutant and native sequence (bases or residues) as byte arrays in one numpy pass and keeps
+    the positions that differ over their shared length, how many of those are transversions and the length difference"""
+    __slots__ = ('mutant', 'native', 'differences', 'transversions', 'length_difference')
+
+    def __init__(self, mutant_gene, native_gene):
+        self.mutant = Sequence_String(mutant_gene)
+        self.native = Sequence_String(native_gene)
+        Length = min(len(self.mutant), len(self.native))
+        Mutant_Bytes = np.frombuffer(self.mutant[:Length].encode(), dtype=np.uint8)
+        Native_Bytes = np.frombuffer(self.native[:Length].encode(), dtype=np.uint8)
+        self.differences = np.flatnonzero(Mutant_Bytes != Native_Bytes)
+        Mutant_Changes = Mutant_Bytes[self.differences]
+        Native_Changes = Native_Bytes[self.differences]
+        self.transversions = int(np.count_nonzero((PURINES[Native_Changes] & PYRIMIDINES[Mutant_Changes]) | (PYRIMIDINES[Native_Changes] & PURINES[Mutant_Changes])))
+        self.length_difference = abs(len(self.mutant) - len(self.native))
+
+    def Count(self):
+        """Number of differing positions plus the length difference"""
+        return len(self.differences) + self.length_difference
+
+    def Info(self, offset=0, missing=False):
+        """Lists the differences as native, position + offset, mutant. Native positions past the end of the mutant are
+        listed without a mutant residue if missing is set, and are an IndexError otherwise as they always were"""
+        Output = ''.join([self.native[position] + str(position + 1 + offset) + self.mutant[position] + ',' for position in self.differences.tolist()])
+        if len(self.native) > len(self.mutant):
+            if missing == False:
+                raise IndexError('string index out of range')
+            Output = Output + ''.join([self.native[position] + str(position + 1 + offset) + ',' for position in range(len(self.mutant), len(self.native))])
+        return Output
+
+class Region_Comparison(object):
+    """Compares a genome region with its reference gene once, at base and codon level, and keeps all the statistics a GAMA
+    line is made from: bp changes, transversions, both translations, codon changes and where the genome region has stops"""
+    __slots__ = ('bases', 'genome_pro', 'gene_pro', 'codons', 'stops')
+
+    def __init__(self, genome_gene, gene):
+        self.bases = Sequence_Comparison(genome_gene, gene)
+        self.genome_pro = Protein(self.bases.mutant)
+        self.gene_pro = Protein(self.bases.native)
+        self.codons = Sequence_Comparison(self.genome_pro, self.gene_pro)
+        self.stops = np.flatnonzero(np.frombuffer(self.genome_pro.encode(), dtype=np.uint8) == ord('*'))
+
+    def BP_Changes(self):
+        return self.bases.Count()
+
+    def Transversions(self):
+        return self.bases.transversions
+
+    def Codon_Changes(self):
+        return self.codons.Count()
+
+    def Internal_Stop(self):
+        """True if the genome region has a stop before its last codon"""
+        return len(self.stops) > 0 and self.stops[0] < len(self.genome_pro) - 1
+
+    def Truncation_Location(self):
+        """Codon index of the first stop in the genome region"""
+        if len(self.stops) > 0:
+            return int(self.stops[0])
+
+class Indel_Comparison(object):
+    """Compares a genome region that has indels with its reference gene once, and keeps all the statistics an indel GAMA
+    line is made from: the match blocks and indels, bp changes and transversions between the indels, both translations,
+    codon changes between the indels that restore the frame and where the genome region has stops"""
+    __slots__ = ('blocks', 'base_info', 'bp_changes', 'transversions', 'genome_pro', 'gene_pro', 'codon_mutants', 'codon_indels', 'codon_info', 'stops')
+
+    def __init__(self, PSL_Line, genome_gene, gene, Blocks=None):
+        if Blocks is None:
+            Blocks = Match_Start_Stop_Finder(PSL_Line)
+        self.blocks = Blocks
+        self.base_info = Indel_Base_Info(PSL_Line, Blocks)
+        genome_gene = Sequence_String(genome_gene)
+        gene = Sequence_String(gene)
+        self.bp_changes = 0
+        self.transversions = 0
+        for Block in Indel_Base_Blocks(self.base_info, genome_gene, gene):
+            Comparison = Sequence_Comparison(Block[0], Block[1])
+            self.bp_changes = self.bp_changes + Comparison.Count()
+            self.transversions = self.transversions + Comparison.transversions
+        for entries in self.base_info:
+            self.bp_changes = self.bp_changes + entries[1]
+        self.genome_pro = Protein(genome_gene)
+        self.gene_pro = Protein(gene)
+        self.codon_mutants = 0
+        self.codon_indels = 0
+        Info = []
+        for Block in Indel_Codon_Blocks(self.base_info, self.genome_pro, self.gene_pro):
+            Comparison = Sequence_Comparison(Block[0], Block[1])
+            self.codon_mutants = self.codon_mutants + Comparison.Count()
+            self.codon_indels = self.codon_indels + abs(Block[3])
+            Info.append(Comparison.Info(Block[2], missing=True))
+        self.codon_info = ''.join(Info)
+        self.stops = np.flatnonzero(np.frombuffer(self.genome_pro.encode(), dtype=np.uint8) == ord('*'))
+
+    def Codon_Changes(self):
+        """Codon changes plus the codons inserted or deleted"""
+        return self.codon_mutants + self.codon_indels
+
+    def Base_Output(self):
+        return Indel_Base_Output(None, self.base_info)
+
+    def Codon_Info(self):
+        """The indels followed by the codon changes"""
+        return self.Base_Output() + self.codon_info
+
+    def Internal_Stop(self):
+        """True if the genome region has a stop before its last codon"""
+        return len(self.stops) > 0 and self.stops[0] < len(self.genome_pro) - 1
+
+    def Truncation_Location(self):
+        """Codon index of the first stop in the genome region"""
+        if len(self.stops) > 0:
+            return int(self.stops[0])
+
+class Edge_Comparison(object):
+    """Compares a genome region cut short by the contig edge with its reference gene once, and keeps all the statistics a
+    contig edge GAMA line is made from: the match blocks, bp changes, transversions, codon changes in the gene's frame
+    and how many bases and codons are past the contig edge"""
+    __slots__ = ('blocks', 'bases', 'codons', 'bp_missing', 'codon_missing')
+
+    def __init__(self, PSL_Line, genome_gene, gene, Blocks=None):
+        if Blocks is None:
+            Blocks = Match_Start_Stop_Finder(PSL_Line)
+        self.blocks = Blocks
+        self.bases = Sequence_Comparison(genome_gene, gene)
+        Offset = int(Blocks[1][0]) % 3
+        if Offset != 0:
+            Offset = 3 - Offset
+        self.codons = Sequence_Comparison(Protein(self.bases.mutant[Offset:]), Protein(self.bases.native[Offset:]))
+        self.bp_missing = Edge_BP_Missing(PSL_Line, Blocks)
+        self.codon_missing = Edge_Codon_Missing(PSL_Line, Blocks)
+
+    def BP_Total(self):
+        return self.bases.Count() + self.bp_missing
+
+    def Codon_Total(self):
+        return self.codons.Count() + self.codon_missing
+
 def Transversion_Count(mutant_gene, native_gene):
     #print("pre20")
     """Takes in a mutant gene and a native gene and returns the # of mutations"""
-    Count = 0
-    mutant_gene = mutant_gene.upper()
-    native_gene = native_gene.upper()
-    Native_Length = len(native_gene)
-    Mutant_Length = len(mutant_gene)
-    Length = min([len(native_gene), len(mutant_gene)])
-    for characters in range(Length):
-        if native_gene[characters] != mutant_gene[characters]:
-            if native_gene[characters] == 'G' or native_gene[characters] == 'A':
-                if mutant_gene[characters] == 'C' or mutant_gene[characters] == 'T':
-                    Count = Count + 1
-            elif native_gene[characters] == 'C' or native_gene[characters] == 'T':
-                if mutant_gene[characters] == 'G' or mutant_gene[characters] == 'A':
-                    Count = Count + 1
-    return Count
+    return Sequence_Comparison(mutant_gene, native_gene).transversions
 
 def Mutant_Count(mutant_gene, native_gene):
     #print("pre21")
     """Takes in a mutant gene and a native gene and returns the # of mutations"""
-    Count = 0
-    mutant_gene = mutant_gene.upper()
-    native_gene = native_gene.upper()
-    Native_Length = len(native_gene)
-    Mutant_Length = len(mutant_gene)
-    Difference = max([len(native_gene), len(mutant_gene)]) - min([len(native_gene), len(mutant_gene)])
-    Length = min([len(native_gene), len(mutant_gene)])
-    for characters in range(Length):
-        if native_gene[characters] != mutant_gene[characters]:
-            Count = Count + 1
-    Count = Count + Difference
-    return Count
+    return Sequence_Comparison(mutant_gene, native_gene).Count()
 
 def Mutant_Info(mutant_gene, native_gene):
     #print("pre22")
-    mutant_gene = mutant_gene.upper()
-    native_gene = native_gene.upper()
-    Output = ''
-    for characters in range(len(native_gene)):
-        if native_gene[characters] != mutant_gene[characters]:
-            Output = Output + native_gene[characters] + str(characters + 1) + mutant_gene[characters] + ','
-    return Output
+    return Sequence_Comparison(mutant_gene, native_gene).Info()
 
 def Mutant_Info_Offset(mutant_gene, native_gene, offset):
     #print("pre23")
     """Same as Mutant_Info but provides an offset value to match positions"""
-    mutant_gene = mutant_gene.upper()
-    native_gene = native_gene.upper()
-    Output = ''
-    for characters in range(len(native_gene)):
-        if characters >= len(mutant_gene):
-            Output = Output + native_gene[characters] + str(characters + 1 + offset) + ','
-        elif native_gene[characters] != mutant_gene[characters]:
-            Output = Output + native_gene[characters] + str(characters + 1 + offset) + mutant_gene[characters] + ','
-    if len(Output) == 0:
-        Output = ''
-    return(Output)
+    return Sequence_Comparison(mutant_gene, native_gene).Info(offset, missing=True)
 
 def Indel_Line(PSL_Line, genome_gene, gene):
     #print("pre24")
     """Makes a GAMA Line for an Indel"""
-    Type = Indel_Typer(PSL_Line, genome_gene, gene)
+    Comparison = Indel_Comparison(PSL_Line, genome_gene, gene)
+    Type = Indel_Typer(PSL_Line, genome_gene, gene, Comparison)
     List1 = PSL_Line.split('\t')
-    Description = Indel_Codon_Info(PSL_Line, genome_gene, gene)
-    Codon_Changes = Indel_Codon_Count(PSL_Line, genome_gene, gene)
-    Codon_Mutants = Indel_Mutant_Count(PSL_Line, genome_gene, gene)
-    Sum = Indel_Sum(PSL_Line)
+    Codon_Changes = Comparison.Codon_Changes()
+    Codon_Mutants = Comparison.codon_mutants
+    Sum = Indel_Sum(PSL_Line, Comparison.base_info)
     Codon_Sum = Sum // 3
     Coding_Length = int(List1[14]) // 3
     if Type == 'Indel Truncation':
-        Location = Truncation_Location(genome_gene)
+        Location = Truncation_Location(genome_gene, Comparison)
         Location = str(Location + 1)
-        Info = Indel_Base_Output(PSL_Line)
+        Info = Comparison.Base_Output()
         Description = Info + 'truncation at codon ' + Location + ' (of ' + str(Coding_Length) + ' codons),' + str(Codon_Mutants) + ' coding mutations'
     elif Codon_Changes - Codon_Sum < 10:
-        Description = Indel_Codon_Info(PSL_Line, genome_gene, gene)
+        Description = Comparison.Codon_Info()
     else:
-        Info = Indel_Base_Output(PSL_Line)
+        Info = Comparison.Base_Output()
         Description = Info + str(Codon_Mutants) + ' coding mutations'
-    BP_Changes = Indel_BP_Count(PSL_Line, genome_gene, gene)
-    Transversions = Indel_Transversion_Count(PSL_Line, genome_gene, gene)
+    BP_Changes = Comparison.bp_changes
+    Transversions = Comparison.transversions
     Percent_Codons = str(Decimal(Coding_Length - Codon_Changes) / Decimal(Coding_Length))
     Percent_Bases = str(Decimal(int(List1[14]) - BP_Changes) / Decimal(int(List1[14])))
-    Match_Length = Match_Length_Maker(PSL_Line)
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
+    Blocks = Comparison.blocks
+    Match_Length = Match_Length_Maker(PSL_Line, Blocks)
     Start = str(Blocks[0][0])
     Stop = str(Blocks[0][1])
     if List1[8] == '-':
@@ -472,36 +538,36 @@ def Indel_Line(PSL_Line, genome_gene, gene):
 def Indel_Edge_Line(PSL_Line, genome_gene, gene):
     #print("pre25")
     """Makes a GAMA Line for an Indel"""
-    Type = Indel_Typer(PSL_Line, genome_gene, gene)
+    Comparison = Indel_Comparison(PSL_Line, genome_gene, gene)
+    Type = Indel_Typer(PSL_Line, genome_gene, gene, Comparison)
     List1 = PSL_Line.split('\t')
-    Description = Indel_Codon_Info(PSL_Line, genome_gene, gene)
-    Codon_Changes = Indel_Codon_Count(PSL_Line, genome_gene, gene)
-    Codon_Missing = Edge_Codon_Missing(PSL_Line)
+    Blocks = Comparison.blocks
+    Codon_Changes = Comparison.Codon_Changes()
+    Codon_Missing = Edge_Codon_Missing(PSL_Line, Blocks)
     Codon_Total = Codon_Changes + Codon_Missing
-    Codon_Mutants = Indel_Mutant_Count(PSL_Line, genome_gene, gene)
-    BP_Changes = Indel_BP_Count(PSL_Line, genome_gene, gene)
-    BP_Missing = Edge_BP_Missing(PSL_Line)
+    Codon_Mutants = Comparison.codon_mutants
+    BP_Changes = Comparison.bp_changes
+    BP_Missing = Edge_BP_Missing(PSL_Line, Blocks)
     BP_Total = BP_Changes + BP_Missing
-    Sum = Indel_Sum(PSL_Line)
+    Sum = Indel_Sum(PSL_Line, Comparison.base_info)
     Codon_Sum = Sum // 3
     Coding_Length = int(List1[14]) // 3
     if Type == 'Indel Truncation':
-        Location = Truncation_Location(genome_gene)
+        Location = Truncation_Location(genome_gene, Comparison)
         Location = str(Location + 1)
-        Info = Indel_Base_Output(PSL_Line)
+        Info = Comparison.Base_Output()
         Description = Info + 'truncation at codon ' + Location + ' (of ' + str(Coding_Length) + ' codons),' + str(Codon_Mutants) + ' coding mutations'
     elif Codon_Changes - Codon_Sum < 10:
-        Description = Indel_Codon_Info(PSL_Line, genome_gene, gene)
+        Description = Comparison.Codon_Info()
     else:
-        Info = Indel_Base_Output(PSL_Line)
+        Info = Comparison.Base_Output()
         Description = Info + str(Codon_Mutants) + ' coding mutations'
     Type = Type + ' (contig edge)'
     Description = Description + ' for ' + str(int(List1[15]) + 1) + '-' + str(int(List1[16])) + ' of ' + List1[14] + ' bp'
-    Transversions = Indel_Transversion_Count(PSL_Line, genome_gene, gene)
+    Transversions = Comparison.transversions
     Percent_Codons = str(Decimal(Coding_Length - Codon_Total) / Decimal(Coding_Length))
     Percent_Bases = str(Decimal(int(List1[14]) - BP_Total) / Decimal(int(List1[14])))
-    Match_Length = Match_Length_Maker(PSL_Line)
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
+    Match_Length = Match_Length_Maker(PSL_Line, Blocks)
     Start = str(Blocks[0][0])
     Stop = str(Blocks[0][1])
     if List1[8] == '-':
@@ -514,16 +580,16 @@ def Indel_Edge_Line(PSL_Line, genome_gene, gene):
 def Mutant_Line(PSL_Line, genome_gene, gene):
     #print("pre26")
     """Makes a GAMA Line for an Mutant"""
-    Type = Mutant_Typer(PSL_Line, genome_gene, gene)
+    Comparison = Region_Comparison(genome_gene, gene)
+    Type = Mutant_Typer(PSL_Line, genome_gene, gene, Comparison)
     List1 = PSL_Line.split('\t')
-    genome_pro = str(genome_gene.seq.translate())
-    gene_pro = str(gene.seq.translate())
-    Description = Mutant_Info(genome_pro, gene_pro)
-    Codon_Changes = Mutant_Count(genome_pro, gene_pro)
+    gene_pro = Comparison.gene_pro
+    Description = Comparison.codons.Info()
+    Codon_Changes = Comparison.Codon_Changes()
     if Description == '':
         Description = 'No coding mutations'
     elif Type == 'Truncation':
-        Location = Truncation_Location(genome_gene)
+        Location = Truncation_Location(genome_gene, Comparison)
         Location = str(Location + 1)
         Description = 'truncation at codon ' + Location + ' (of ' + str(len(gene_pro)) + ' codons),' + str(Codon_Changes) + ' coding mutations'
     elif Codon_Changes > 10:
@@ -532,8 +598,8 @@ def Mutant_Line(PSL_Line, genome_gene, gene):
         Type = Type + ' (partial match)'
         Description = List1[1] + ' SNPs in ' + str(int(List1[15]) + 1) + '-' + str(int(List1[16])) + ',' + Description
     Coding_Length = int(List1[14]) // 3
-    BP_Changes = Mutant_Count(str(genome_gene.seq), str(gene.seq))
-    Transversions = Transversion_Count(str(genome_gene.seq), str(gene.seq))
+    BP_Changes = Comparison.BP_Changes()
+    Transversions = Comparison.Transversions()
     Percent_Codons = str(Decimal(Coding_Length - Codon_Changes) / Decimal(Coding_Length))
     Percent_Bases = str(Decimal(int(List1[14]) - BP_Changes) / Decimal(int(List1[14])))
     Match_Length = List1[14]
@@ -550,65 +616,42 @@ def Mutant_Line(PSL_Line, genome_gene, gene):
 def Edge_Codon_Total(PSL_Line, genome_gene, gene):
     #print("pre27")
     """Counts codon differences from edge matches"""
-    Positions = Match_Start_Stop_Finder(PSL_Line)
-    Gene_Start = Positions[1][0]
-    Offset = int(Gene_Start) % 3
-    if Offset != 0:
-        Offset = 3 - Offset
-    genome_pro = str(genome_gene[Offset:].seq.translate())
-    gene_pro = str(gene[Offset:].seq.translate())
-    Count = Mutant_Count(genome_pro, gene_pro)
-    Missing = Edge_Codon_Missing(PSL_Line)
-    Count = Count + Missing
-    return Count
+    return Edge_Comparison(PSL_Line, genome_gene, gene).Codon_Total()
 
 def Edge_Codon_Count(PSL_Line, genome_gene, gene):
     #print("pre28")
     """Counts codon differences from edge matches"""
-    Positions = Match_Start_Stop_Finder(PSL_Line)
-    Gene_Start = Positions[1][0]
-    Offset = int(Gene_Start) % 3
-    if Offset != 0:
-        Offset = 3 - Offset
-    genome_pro = str(genome_gene[Offset:].seq.translate())
-    gene_pro = str(gene[Offset:].seq.translate())
-    Count = Mutant_Count(genome_pro, gene_pro)
-##    Missing = Edge_Codon_Missing(PSL_Line)
-##    Count = Count + Missing
-    return Count
+    return Edge_Comparison(PSL_Line, genome_gene, gene).codons.Count()
 
 def Edge_BP_Count(PSL_Line, genome_gene, gene):
     #print("pre29")
     """Counts bp differences from edge matches"""
-    Count = Mutant_Count(genome_gene, gene)
-    return Count
+    return Edge_Comparison(PSL_Line, genome_gene, gene).bases.Count()
 
 def Edge_Transversion_Count(PSL_Line, genome_gene, gene):
     #print("pre30")
     """Counts transversion differences from edge matches"""
-    Count = Transversion_Count(genome_gene, gene)
-    return Count
+    return Edge_Comparison(PSL_Line, genome_gene, gene).bases.transversions
 
 def Edge_BP_Total(PSL_Line, genome_gene, gene):
     #print("pre31")
     """Counts bp differences from edge matches"""
-    Count = Mutant_Count(genome_gene, gene)
-    Missing = Edge_BP_Missing(PSL_Line)
-    Count = Count + Missing
-    return Count
+    return Edge_Comparison(PSL_Line, genome_gene, gene).BP_Total()
 
-def Edge_BP_Missing(PSL_Line):
+def Edge_BP_Missing(PSL_Line, Blocks=None):
     #print("pre32")
     List1 = PSL_Line.split('\t')
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
+    if Blocks is None:
+        Blocks = Match_Start_Stop_Finder(PSL_Line)
     Total = Blocks[1][1] - Blocks[1][0]
     Missing = int(List1[14]) - Total
     return Missing
 
-def Edge_Codon_Missing(PSL_Line):
+def Edge_Codon_Missing(PSL_Line, Blocks=None):
     #print("pre33")
     List1 = PSL_Line.split('\t')
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
+    if Blocks is None:
+        Blocks = Match_Start_Stop_Finder(PSL_Line)
     Codons = int(List1[14]) // 3
     Front = math.ceil(Blocks[1][0] / float(3))
     Back = Blocks[1][1] // 3
@@ -620,17 +663,18 @@ def Edge_Line(PSL_Line, genome_gene, gene):
     """Makes a GAMA line from edge matches w/o indels"""
     Type = "Contig Edge"
     List1 = PSL_Line.split('\t')
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
-    Codon_Changes = Edge_Codon_Total(PSL_Line, genome_gene, gene)
-    Codon_Count = Edge_Codon_Count(PSL_Line, genome_gene, gene)
+    Comparison = Edge_Comparison(PSL_Line, genome_gene, gene)
+    Blocks = Comparison.blocks
+    Codon_Changes = Comparison.Codon_Total()
+    Codon_Count = Comparison.codons.Count()
     Coding_Length = int(List1[14]) // 3
-    BP_Changes = Edge_BP_Total(PSL_Line, genome_gene, gene)
-    BP_Count = Edge_BP_Count(PSL_Line, genome_gene, gene)
-    Transversions = Edge_Transversion_Count(PSL_Line, genome_gene, gene)
+    BP_Changes = Comparison.BP_Total()
+    BP_Count = Comparison.bases.Count()
+    Transversions = Comparison.bases.transversions
     Description = str(BP_Count) + ' SNPs,' + str(Codon_Count) + ' coding mutations for ' + str(Blocks[1][0] + 1) + '-' + str(Blocks[1][1]) + ' of ' + List1[14] + ' bp'
     Percent_Codons = str(Decimal(Coding_Length - Codon_Changes) / Decimal(Coding_Length))
     Percent_Bases = str(Decimal(int(List1[14]) - BP_Changes) / Decimal(int(List1[14])))
-    Match_Length = Match_Length_Maker(PSL_Line)
+    Match_Length = Match_Length_Maker(PSL_Line, Blocks)
     Start = str(Blocks[0][0])
     Stop = str(Blocks[0][1])
     if List1[8] == '-':
@@ -714,32 +758,73 @@ def Match_Start_Stop_Finder(PSL_Line):
     Output.append(Gene_Starts)
     return Output
 
-def Match_Length_Maker(PSL_Line):
+def Match_Length_Maker(PSL_Line, Blocks=None):
     #print("pre36")
     """Finds the length of the bp between the start and stop of a gene match on a contig"""
-    Blocks = Match_Start_Stop_Finder(PSL_Line)
+    if Blocks is None:
+        Blocks = Match_Start_Stop_Finder(PSL_Line)
     Length = int(Blocks[0][1]) - int(Blocks[0][0])
     return Length
 
-def GAMA_Line_Maker(PSL, genome_fasta, genes_fasta):
-    #print("pre37")
-    """Makes a list of potential GAMA lines from a PSL file matching Genes to a Genome"""
-    f = open(PSL, 'r')
-    Lines = []
-    String1 = f.readline()
-    while String1 != '':
-        Lines.append(String1)
-        String1 = f.readline()
-    f.close()
-    Genome = SeqIO.to_dict(SeqIO.parse(genome_fasta, 'fasta'))
-    Genes = SeqIO.to_dict(SeqIO.parse(genes_fasta, 'fasta'))
+def Gene_Index(genes_fasta):
+    """Opens the gene database through an offset index cached next to it (genes_fasta.idx), rebuilt when the database is newer"""
+    Index_File = genes_fasta + '.idx'
+    try:
+        if os.path.isfile(Index_File) and os.path.getmtime(Index_File) >= os.path.getmtime(genes_fasta):
+            return SeqIO.index_db(Index_File)
+        Handle, Building = tempfile.mkstemp(prefix='.building_', suffix='.idx', dir=os.path.dirname(os.path.abspath(genes_fasta)))
+        os.close(Handle)
+        os.remove(Building)
+        Genes = SeqIO.index_db(Building, os.path.abspath(genes_fasta), 'fasta')
+        Genes.close()
+        os.rename(Building, Index_File)
+        return SeqIO.index_db(Index_File)
+    except (IOError, OSError, sqlite3.Error):
+        return SeqIO.index(genes_fasta, 'fasta')
+
+def BLAT_PSL_Lines(genes_fasta, genome_fasta, Keep_PSL=None):
+    """Runs blat with its PSL written to a pipe and yields the lines as blat finishes each contig, copying them to Keep_PSL if given"""
+    BLAT = subprocess.Popen(['blat', genes_fasta, genome_fasta, '-noHead', 'stdout'], stdout=subprocess.PIPE, universal_newlines=True)
+    Kept = None
+    if Keep_PSL is not None:
+        Kept = open(Keep_PSL, 'w')
+    for line in BLAT.stdout:
+        # Skip anything that is not a 21 column PSL line, like blat's loaded/searched counts
+        if line.count('\t') < 20:
+            continue
+        if Kept is not None:
+            Kept.write(line)
+        yield line
+    BLAT.stdout.close()
+    if Kept is not None:
+        Kept.close()
+    if BLAT.wait() != 0:
+        print('blat exited with status ' + str(BLAT.returncode))
+        sys.exit(1)
+
+def PSL_Contig_Groups(PSL_Lines):
+    """Yields runs of consecutive PSL lines on the same contig"""
+    Group = []
+    for line in PSL_Lines:
+        if len(Group) > 0 and line.split('\t', 10)[9] != Group[0].split('\t', 10)[9]:
+            yield Group
+            Group = []
+        Group.append(line)
+    if len(Group) > 0:
+        yield Group
+
+def GAMA_Contig_Lines(PSL_Group, Genome, Genes, Gene_Hits):
+    """Makes the potential GAMA lines for a run of PSL lines on one contig, keeping genes with hits in Gene_Hits for reuse"""
+    Contig_Record = Genome[PSL_Group[0].split('\t')[9]]
     Output = []
-    for line in Lines:
+    for line in PSL_Group:
         List1 = line.split('\t')
 ##        print(List1[13])
+        if List1[13] not in Gene_Hits:
+            Gene_Hits[List1[13]] = Genes[List1[13]]
         Positions = Match_Start_Stop_Finder(line)
-        gene = Genes[List1[13]][Positions[1][0]:Positions[1][1]]
-        genome = Genome[List1[9]]
+        gene = Gene_Hits[List1[13]][Positions[1][0]:Positions[1][1]]
+        genome = Contig_Record
         if List1[8] == '-':
             genome = genome.reverse_complement()
         genome = genome[Positions[0][0]:Positions[0][1]]
@@ -765,20 +850,65 @@ def GAMA_Line_Maker(PSL, genome_fasta, genes_fasta):
             Output.append(Out)
     return Output
 
+# Genome and gene indexes opened once in each worker process by GAMA_Worker_Start
+Worker_Indexes = {}
+
+def GAMA_Worker_Start(genome_fasta, genes_fasta):
+    """Opens the genome and gene indexes for a worker process"""
+    Worker_Indexes['Genome'] = SeqIO.index(genome_fasta, 'fasta')
+    Worker_Indexes['Genes'] = Gene_Index(genes_fasta)
+    Worker_Indexes['Gene_Hits'] = {}
+
+def GAMA_Worker(PSL_Group):
+    """Pool worker making the GAMA lines for one contig's PSL lines"""
+    return GAMA_Contig_Lines(PSL_Group, Worker_Indexes['Genome'], Worker_Indexes['Genes'], Worker_Indexes['Gene_Hits'])
+
+def GAMA_Line_Maker(PSL_Lines, genome_fasta, genes_fasta, threads=1, Genes=None, Gene_Hits=None):
+    #print("pre37")
+    """Makes a list of potential GAMA lines from PSL lines (file or blat pipe) matching Genes to a Genome. PSL lines come grouped
+    by contig, so only the current contig's record is held at a time. With threads > 1 contigs are split across worker processes,
+    the lines come back in PSL order so the output is the same as the serial path. Genes and Gene_Hits let batch mode reuse one
+    open gene index and the genes already read from it"""
+    Output = []
+    if threads > 1:
+        # Build the cached gene index once before the workers open it
+        Gene_Index(genes_fasta).close()
+        Pool = multiprocessing.Pool(threads, GAMA_Worker_Start, (genome_fasta, genes_fasta))
+        try:
+            # Contigs are handed out from this process as the PSL is read, so a blat failure still ends the run here
+            Results = [Pool.apply_async(GAMA_Worker, (PSL_Group,)) for PSL_Group in PSL_Contig_Groups(PSL_Lines)]
+            for Result in Results:
+                Output.extend(Result.get())
+        except BaseException:
+            Pool.terminate()
+            raise
+        Pool.close()
+        Pool.join()
+        return Output
+    Genome = SeqIO.index(genome_fasta, 'fasta')
+    Close_Genes = Genes is None
+    if Close_Genes:
+        Genes = Gene_Index(genes_fasta)
+    if Gene_Hits is None:
+        Gene_Hits = {}
+    for PSL_Group in PSL_Contig_Groups(PSL_Lines):
+        Output.extend(GAMA_Contig_Lines(PSL_Group, Genome, Genes, Gene_Hits))
+    Genome.close()
+    if Close_Genes:
+        Genes.close()
+    return Output
+
 def Contig_Overlaps(input_list):
     #print("pre38")
-    """Takes in a GAMA list and makes a list of lists based on overlaps"""
+    """Takes in a GAMA list and makes a list of lists of the lines on each contig, in order of first appearance"""
     Out_List = []
+    Contigs = {}
     for lines in input_list:
-        List1 = lines.split('\t')
-        Add = 1
-        for items in Out_List:
-            if items[0].split('\t')[1] == List1[1]:
-                items.append(lines)
-                Add = 0
-        if Add == 1:
-            New_Contig = [lines]
-            Out_List.append(New_Contig)
+        Contig = lines.split('\t')[1]
+        if Contig not in Contigs:
+            Contigs[Contig] = []
+            Out_List.append(Contigs[Contig])
+        Contigs[Contig].append(lines)
     return Out_List
 
 def Internal(a,b):
@@ -853,58 +983,75 @@ def Edge_Line_Comp(Edge_1, Edge_2):
                     Add = 0
     return Add
 
+class GAMA_Record(object):
+    """A GAMA line split once, with the fields Best_List compares converted up front"""
+    __slots__ = ('line', 'fields', 'start', 'stop', 'edge', 'codon_percent', 'bp_percent', 'length_percent', 'match_length', 'transversions', 'edge_codons', 'edge_bps')
+
+    def __init__(self, line):
+        self.line = line
+        self.fields = line.split('\t')
+        self.start = int(self.fields[2])
+        self.stop = int(self.fields[3])
+        self.edge = self.fields[4] == 'Contig Edge'
+        self.codon_percent = float(self.fields[8])
+        self.bp_percent = float(self.fields[9])
+        self.length_percent = float(self.fields[10])
+        self.match_length = int(self.fields[11])
+        self.transversions = int(self.fields[13])
+        if self.edge:
+            self.edge_codons = Edge_Codon_Changes(line)
+            self.edge_bps = Edge_BP_Changes(line)
+
+def Record_Beaten(record, other):
+    """True if other is a better match than record, the same comparisons Best_List has always made"""
+    if record.edge and other.edge:
+        if record.edge_codons != other.edge_codons:
+            return record.edge_codons > other.edge_codons
+        if record.edge_bps != other.edge_bps:
+            return record.edge_bps > other.edge_bps
+        if record.transversions != other.transversions:
+            return record.transversions > other.transversions
+        return other.line < record.line
+    if other.codon_percent != record.codon_percent:
+        return other.codon_percent > record.codon_percent
+    if other.bp_percent != record.bp_percent:
+        return other.bp_percent > record.bp_percent
+    if other.length_percent != record.length_percent:
+        return other.length_percent > record.length_percent
+    if other.match_length != record.match_length:
+        return other.match_length > record.match_length
+    if other.transversions != record.transversions:
+        return other.transversions < record.transversions
+    return other.line < record.line
+
 def Best_List(input_contig_list):
     #print("pre44")
-    """Finds the best matches for a set of matches to the same contig"""
+    """Finds the best matches for a set of matches to the same contig. Matches are swept in start order so each one is only
+    compared with those that could overlap it by more than half, a match is dropped if any of them beats it"""
+    Records = [GAMA_Record(items) for items in input_contig_list]
+    Sorted_Records = sorted(Records, key=lambda record: record.start)
+    Starts = [record.start for record in Sorted_Records]
+    Longest = max([record.stop - record.start for record in Records] + [0])
     Output_List = []
-    for items in input_contig_list:
+    for record in Records:
         Add = 1
-        List1 = items.split('\t')
-        for items_2 in input_contig_list:
-            List2 = items_2.split('\t')
-            if items == items_2:
+        First = bisect.bisect_right(Starts, record.start - Longest)
+        Last = bisect.bisect_left(Starts, record.stop)
+        for other in Sorted_Records[First:Last]:
+            if other.line == record.line or other.stop <= record.start:
                 continue
-            elif Overlap_Fraction([int(List1[2]), int(List1[3])], [int(List2[2]), int(List2[3])]) > 0.5:
-##                if ('Truncation' in List1[4]) == True and ('Truncation' in List2[4]) == False:
-##                    Add == 0
-                if List1[4] == 'Contig Edge' and List2[4] == 'Contig Edge':
-                    Add = Edge_Line_Comp(items, items_2)
-                    if Add == 0:
-                        break
-                elif float(List2[8]) > float(List1[8]):
-                    Add = 0
-                    break
-                elif float(List2[8]) == float(List1[8]):
-                    if float(List2[9]) > float(List1[9]):
-                        Add = 0
-                        break
-                    elif float(List2[9]) == float(List1[9]):
-                        if float(List2[10]) > float(List1[10]):
-                            Add = 0
-                            break
-                        elif float(List2[10]) == float(List1[10]):
-                            if int(List2[11]) > int(List1[11]):
-                                Add = 0
-                                break
-                            elif int(List2[11]) == int(List1[11]):
-                                if int(List2[13]) < int(List1[13]):
-                                    Add = 0
-                                    break
-                                elif int(List2[13]) == int(List1[13]):
-                                    Order_List = [items, items_2]
-                                    Order_List.sort()
-                                    if Order_List[0] != items:
-                                        Add = 0
-                                        break
-        if Add == 1 and float(List1[10]) > 0.5:
-            Out = '\t'.join(List1[0:13])
-            Out = Out + '\t' + List1[-1]
+            elif Overlap_Fraction([record.start, record.stop], [other.start, other.stop]) > 0.5 and Record_Beaten(record, other):
+                Add = 0
+                break
+        if Add == 1 and record.length_percent > 0.5:
+            Out = '\t'.join(record.fields[0:13])
+            Out = Out + '\t' + record.fields[-1]
             Output_List.append(Out)
     return(Output_List)
 
-def GAMA_List(PSL, genome_fasta, genes_fasta):
+def GAMA_List(PSL_Lines, genome_fasta, genes_fasta, threads=1, Genes=None, Gene_Hits=None):
     #print("pre45")
-    Lines = GAMA_Line_Maker(PSL, genome_fasta, genes_fasta)
+    Lines = GAMA_Line_Maker(PSL_Lines, genome_fasta, genes_fasta, threads, Genes, Gene_Hits)
     Contig_Lines = Contig_Overlaps(Lines)
     Final_List = []
     for contigs in Contig_Lines:
@@ -913,18 +1060,18 @@ def GAMA_List(PSL, genome_fasta, genes_fasta):
             Final_List.append(lines)
     return Final_List
 
-def GAMA_Output(PSL, genome_fasta, genes_fasta, Out_File):
+def GAMA_Output(PSL_Lines, genome_fasta, genes_fasta, Out_File, threads=1, Genes=None, Gene_Hits=None):
     #print("pre46")
-    List1 = GAMA_List(PSL, genome_fasta, genes_fasta)
+    List1 = GAMA_List(PSL_Lines, genome_fasta, genes_fasta, threads, Genes, Gene_Hits)
     Output = open(Out_File, 'w')
     Output.write('Gene\tContig\tStart\tStop\tMatch_Type\tDescription\tCodon_Changes\tBP_Changes\tCodon_Percent\tBP_Percent\tPercent_Length\tMatch_Length\tTarget_Length\tStrand\n')
     for lines in List1:
         Output.write(lines + '\n')
     Output.close()
 
-def GAMA_ResGANNOT_Output(PSL, genome_fasta, genes_fasta, Out_File):
+def GAMA_ResGANNOT_Output(PSL_Lines, genome_fasta, genes_fasta, Out_File, threads=1, Genes=None, Gene_Hits=None):
     #print("pre47")
-    List1 = GAMA_List(PSL, genome_fasta, genes_fasta)
+    List1 = GAMA_List(PSL_Lines, genome_fasta, genes_fasta, threads, Genes, Gene_Hits)
     Output = open(Out_File, 'w')
     Output.write('DB\tResistance\tGene_Family\tGene\tContig\tStart\tStop\tMatch_Type\tDescription\tCodon_Changes\tBP_Changes\tCodon_Percent\tBP_Percent\tPercent_Length\tMatch_Length\tTarget_Length\tStrand\n')
     for lines in List1:
@@ -937,14 +1084,76 @@ def GAMA_ResGANNOT_Output(PSL, genome_fasta, genes_fasta, Out_File):
         Output.write(Out_Line + '\n')
     Output.close()
 
-args = parseArgs()
+def GAMA_Batch_List(list_file):
+    """Reads a batch list of assemblies, one per line, each optionally followed by a tab and the .GAMA file to write
+    (default: the assembly name with its extension replaced by .GAMA)"""
+    Samples = []
+    for line in open(list_file, 'r'):
+        List1 = line.rstrip('\n').split('\t')
+        if List1[0].strip() == '':
+            continue
+        if len(List1) > 1 and List1[1].strip() != '':
+            Samples.append([List1[0].strip(), List1[1].strip()])
+        else:
+            Samples.append([List1[0].strip(), os.path.splitext(List1[0].strip())[0] + '.GAMA'])
+    return Samples
+
+def BLAT_Batch_Worker(Job):
+    """Thread pool worker running blat for one batch sample, returns the PSL lines or None and the reason blat failed"""
+    genome_fasta, Out_File, genes_fasta, debug = Job
+    Keep_PSL = None
+    if debug:
+        Keep_PSL = Out_File + '.psl'
+    try:
+        return list(BLAT_PSL_Lines(genes_fasta, genome_fasta, Keep_PSL)), None
+    except SystemExit:
+        return None, 'blat failed'
+    except (IOError, OSError) as error:
+        return None, str(error)
 
-Fasta = args.input
-Gene_DB = args.database
-Output = args.output
+def GAMA_Batch(list_file, genes_fasta, jobs=1, threads=1, debug=False):
+    """Runs GAMA on every assembly in a batch list with the gene index opened once. Up to jobs blat searches run at once while
+    finished searches are typed in list order, returns the number of samples that failed"""
+    Samples = GAMA_Batch_List(list_file)
+    Genes = Gene_Index(genes_fasta)
+    Gene_Hits = {}
+    Pool = ThreadPool(max(1, jobs))
+    Jobs = [(Sample[0], Sample[1], genes_fasta, debug) for Sample in Samples]
+    Failed = 0
+    for Sample, Result in zip(Samples, Pool.imap(BLAT_Batch_Worker, Jobs)):
+        PSL, Error = Result
+        if PSL is not None:
+            try:
+                GAMA_ResGANNOT_Output(PSL, Sample[0], genes_fasta, Sample[1], threads, Genes, Gene_Hits)
+                print(Sample[0] + '\t' + Sample[1] + '\tdone')
+                continue
+            except (IOError, OSError, KeyError, ValueError, IndexError) as error:
+                Error = str(error)
+        print(Sample[0] + '\t' + Sample[1] + '\tfailed: ' + Error)
+        Failed = Failed + 1
+    Pool.close()
+    Pool.join()
+    Genes.close()
+    return Failed
 
+if __name__ == '__main__':
+    args = parseArgs()
 
-subprocess.call('blat' + ' ' + Gene_DB + ' '  + Fasta + ' -noHead ' + Output + '.psl', shell=True)
+    Fasta = args.input
+    Gene_DB = args.database
+    Output = args.output
 
 
-GAMA_ResGANNOT_Output(Output +'.psl', Fasta, Gene_DB, Output)
+    if args.list is not None:
+        if GAMA_Batch(args.list, Gene_DB, args.jobs, args.threads, args.debug) > 0:
+            sys.exit(1)
+    elif args.stream:
+        Keep_PSL = None
+        if args.debug:
+            Keep_PSL = Output + '.psl'
+        GAMA_ResGANNOT_Output(BLAT_PSL_Lines(Gene_DB, Fasta, Keep_PSL), Fasta, Gene_DB, Output, args.threads)
+    else:
+        subprocess.call('blat' + ' ' + Gene_DB + ' '  + Fasta + ' -noHead ' + Output + '.psl', shell=True)
+        PSL = open(Output + '.psl', 'r')
+        GAMA_ResGANNOT_Output(PSL, Fasta, Gene_DB, Output, args.threads)
+        PSL.close()
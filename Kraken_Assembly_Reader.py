@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+#
+# Description: Streaming reader for (weighted) kraken assembly output shared by Kraken_Assembly_Converter_2_Exe.py and Kraken_Assembly_Summary_Exe.py.
+#	Collects contig lengths, unclassified bp, total bp and the minimum contig length in one pass so each kraken file is only read once
+#
+# Usage: imported only
+#
+# Output location: None
+#
+# Modules required: None
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+class Kraken_Assembly(object):
+    """Everything the kraken assembly scripts use from one kraken file. Records holds the first four fields of each line
+    (classified flag, contig name, taxID, length) in file order"""
+    __slots__ = ('Records', 'Unclassified', 'Total', 'Minimum')
+
+    def __init__(self):
+        self.Records = []
+        self.Unclassified = 0
+        self.Total = 0
+        self.Minimum = None
+
+    def Lengths(self):
+        """[contig name, length] of each line, as Kraken_Assembly_Lengths used to list them"""
+        return [[Record[1], Record[3]] for Record in self.Records]
+
+def Read_Kraken_Assembly(input_kraken):
+    """Reads a kraken output file once, returning its Kraken_Assembly"""
+    Assembly = Kraken_Assembly()
+    Records = Assembly.Records
+    Unclassified = 0
+    Total = 0
+    Minimum = None
+    f = open(input_kraken, 'r')
+    for String1 in f:
+        List1 = String1.split('\n', 1)[0].split('\t', 4)[0:4]
+        Length = int(List1[3])
+        Records.append(List1)
+        Total = Total + Length
+        if List1[2] == '0':
+            Unclassified = Unclassified + Length
+        if Minimum is None or Minimum > Length:
+            Minimum = Length
+    f.close()
+    Assembly.Unclassified = Unclassified
+    Assembly.Total = Total
+    Assembly.Minimum = Minimum
+    return Assembly
+
+def Write_Weighted_Kraken(Assembly, output_kraken):
+    """Writes a bp weighted kraken file, each contig's line repeated once per minimum contig length it holds"""
+    Min_Length = Assembly.Minimum
+    g = open(output_kraken, 'w')
+    for List1 in Assembly.Records:
+        Count = int(List1[3]) // Min_Length
+        if Count > 0:
+            g.write(('\t'.join(List1) + '\n') * Count)
+    g.close()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+#
+# Description: Regression benchmark for the length weighted summary of Kraken_Assembly_Summary_Exe.py. Builds a synthetic assembly's kraken,
+#	translated label and report files, times the summary on it and checks it writes the same list as the original contig by contig matching
+#
+# Usage: python3 ./Kraken_Assembly_Summary_Benchmark.py [-n number_of_contigs] [-r number_of_contigs_to_compare_with_original] [-m max_seconds]
+#
+# Output location: standard out (synthetic files are written to a temporary folder and removed)
+#
+# Modules required: Biopython must be available in python instance
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import Kraken_Assembly_Summary_Exe as Summary
+
+def parseArgs(args=None):
+	parser = argparse.ArgumentParser(description='Benchmark the weighted kraken assembly summary on a synthetic assembly')
+	parser.add_argument('-n', '--contigs', type=int, default=50000, help='number of contigs in the synthetic assembly (default: 50000)')
+	parser.add_argument('-r', '--reference', type=int, default=5000, help='number of contigs to also run the original summary on and compare (default: 5000)')
+	parser.add_argument('-m', '--max_seconds', type=float, help='exit with an error if summarizing the full synthetic assembly takes longer than this')
+	return parser.parse_args()
+
+# The character by character parsing and contig by contig matching the summary used before, kept as the benchmark reference
+def _Legacy_String_Converter(Input_String):
+    Counter = 0
+    Character = Input_String[0]
+    Current_String = ''
+    Out_List = []
+    while Counter < len(Input_String):
+        if Character == '\n':
+            Out_List.append(Current_String)
+            return Out_List
+        elif Character == '\t':
+            Out_List.append(Current_String)
+            Current_String = ''
+            Counter = Counter + 1
+            Character = Input_String[Counter]
+        else:
+            Current_String = Current_String + Character
+            Counter = Counter + 1
+            Character = Input_String[Counter]
+
+def _Legacy_Translated_Line_Converter(Input_String):
+    Counter = 0
+    Character = Input_String[0]
+    Current_String = ''
+    Out_List = []
+    while Counter < len(Input_String):
+        if Character == '\n':
+            Out_List.append(Current_String)
+            return Out_List
+        elif Character == '\t' or Character == ';':
+            Out_List.append(Current_String)
+            Current_String = ''
+            Counter = Counter + 1
+            Character = Input_String[Counter]
+        else:
+            Current_String = Current_String + Character
+            Counter = Counter + 1
+            Character = Input_String[Counter]
+
+def _Legacy_Kraken_Assembly_Lengths(input_kraken):
+    Output_List = []
+    f = open(input_kraken, 'r')
+    String1 = f.readline()
+    while String1 != '':
+        List1 = _Legacy_String_Converter(String1)
+        Entry = []
+        Entry.append(List1[1])
+        Entry.append(List1[3])
+        Output_List.append(Entry)
+        String1 = f.readline()
+    f.close()
+    return Output_List
+
+def _Legacy_Kraken_Assembly_Unclassified(input_kraken):
+    Length = 0
+    f = open(input_kraken)
+    String1 = f.readline()
+    while String1 != '':
+        List1 = _Legacy_String_Converter(String1)
+        if List1[2] == '0':
+            Length = Length + int(List1[3])
+        String1 = f.readline()
+    f.close()
+    return Length
+
+def _Legacy_Taxonomy_Totals(untranslated_kraken, translated_kraken):
+    Contig_Lengths = _Legacy_Kraken_Assembly_Lengths(untranslated_kraken)
+    f = open(translated_kraken, 'r')
+    Entry_List = []
+    String1 = f.readline()
+    while String1 != '':
+        List1 = _Legacy_Translated_Line_Converter(String1)
+        for contigs in Contig_Lengths:
+            if contigs[0] == List1[0]:
+                for classes in range(1, (len(List1) - 1)):
+                    Class = []
+                    Class.append(List1[classes])
+                    Class.append(contigs[1])
+                    Class.append(0)
+                    Entry_List.append(Class)
+                Class = []
+                Class.append(List1[len(List1) - 1])
+                Class.append(contigs[1])
+                Class.append(contigs[1])
+                Entry_List.append(Class)
+            else:
+                continue
+        String1 = f.readline()
+    f.close()
+    Unclassified_Length = _Legacy_Kraken_Assembly_Unclassified(untranslated_kraken)
+    Unclassified = ['unclassified']
+    Unclassified.append(str(Unclassified_Length))
+    Unclassified.append(str(Unclassified_Length))
+    Entry_List.append(Unclassified)
+    return Entry_List
+
+def _Legacy_List_Combiner(input_list):
+    Output_List = []
+    Output_List.append(input_list[0])
+    for items in range(1, len(input_list)):
+        Match = 0
+        for entries in Output_List:
+            if input_list[items][0] == entries[0]:
+                entries[1] = str(int(entries[1]) + int(input_list[items][1]))
+                entries[2] = str(int(entries[2]) + int(input_list[items][2]))
+                Match = 1
+        if Match == 0:
+            Output_List.append(input_list[items])
+    return Output_List
+
+def _Legacy_Assembly_Summary(input_summary, input_list, output_summary):
+    Total_Length = 0
+    for items in input_list:
+        Total_Length = Total_Length + int(items[2])
+    f= open(input_summary, 'r')
+    g = open(output_summary, 'w')
+    String1 = f.readline()
+    while String1 != '':
+        List1 = _Legacy_String_Converter(String1)
+        for entries in input_list:
+            if entries[0] == Summary.Summary_Taxonomy(String1):
+                Out_Line = ''
+                Percent = Summary.Two_Decimal_Percent(int(entries[1]), Total_Length)
+                if len(Percent) == 4:
+                    Out_Line = '  ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t' + List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+                elif len(Percent) == 5:
+                    Out_Line = ' ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+                elif len(Percent) == 6:
+                    Out_Line = Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+                g.write(Out_Line)
+                break
+        String1 = f.readline()
+    f.close()
+    g.close()
+
+def Synthetic_Assembly(folder, contigs, seed=1):
+    """Writes kraken, translated label and report files for a synthetic assembly of contigs spread over 4 phyla, 40 genera and
+    400 species, with about 1 in 10 contigs unclassified. Returns the three filenames"""
+    random.seed(seed)
+    Lineages = []
+    for species in range(400):
+        genus = species // 10
+        phylum = genus // 10
+        Lineages.append([(2, 'D', 'Bacteria'), (1000 + phylum, 'P', 'Phylum' + str(phylum)), (2000 + genus, 'G', 'Genus' + str(genus)), (10000 + species, 'S', 'Genus' + str(genus) + ' species' + str(species))])
+    Kraken = os.path.join(folder, 'synthetic_BP.kraken')
+    Labels = os.path.join(folder, 'synthetic_BP.labels')
+    Report = os.path.join(folder, 'synthetic_BP.list')
+    f = open(Kraken, 'w')
+    g = open(Labels, 'w')
+    Counts = {}
+    for contig in range(1, contigs + 1):
+        Length = random.randint(200, 200000)
+        Name = 'NODE_' + str(contig) + '_length_' + str(Length) + '_cov_' + str(random.randint(5, 80)) + '.5'
+        if random.random() < 0.1:
+            f.write('U\t' + Name + '\t0\t' + str(Length) + '\t0:' + str(Length - 30) + '\n')
+            Counts[(0, 'U', 'unclassified')] = Counts.get((0, 'U', 'unclassified'), 0) + 1
+            continue
+        Lineage = Lineages[int(random.paretovariate(1.2)) % len(Lineages)]
+        Lineage = Lineage[0:random.randint(1, len(Lineage))]
+        f.write('C\t' + Name + '\t' + str(Lineage[-1][0]) + '\t' + str(Length) + '\t' + str(Lineage[-1][0]) + ':' + str(Length - 30) + '\n')
+        g.write(Name + '\troot;cellular organisms;' + ';'.join(Taxon[2] for Taxon in Lineage) + '\n')
+        for Taxon in [(1, 'R', 'root'), (131567, '-', 'cellular organisms')] + Lineage:
+            Counts[Taxon] = Counts.get(Taxon, 0) + 1
+    f.close()
+    g.close()
+    Depths = {'U': 0, 'R': 0, '-': 1, 'D': 2, 'P': 3, 'G': 4, 'S': 5}
+    h = open(Report, 'w')
+    for Taxon in sorted(Counts, key=lambda Taxon: (Taxon[0] != 0, -Counts[Taxon], Taxon[0])):
+        h.write('{:6.2f}\t{}\t{}\t{}\t{}\t{}{}\n'.format(100.0 * Counts[Taxon] / contigs, Counts[Taxon], Counts[Taxon], Taxon[1], Taxon[0], '  ' * Depths[Taxon[1]], Taxon[2]))
+    h.close()
+    return Kraken, Labels, Report
+
+def Summarize(Kraken, Labels, Report, Output, Legacy=False):
+    """Runs the summary the way the script does and returns the seconds it took"""
+    Start = time.time()
+    if Legacy:
+        _Legacy_Assembly_Summary(Report, _Legacy_List_Combiner(_Legacy_Taxonomy_Totals(Kraken, Labels)), Output)
+    else:
+        Summary.Assembly_Summary(Report, Summary.List_Combiner(Summary.Taxonomy_Totals(Summary.Read_Kraken_Assembly(Kraken), Labels)), Output)
+    return time.time() - Start
+
+def Benchmark(contigs, reference, max_seconds=None):
+    Folder = tempfile.mkdtemp(prefix='kraken_summary_benchmark_')
+    try:
+        if reference > 0:
+            Kraken, Labels, Report = Synthetic_Assembly(Folder, reference)
+            Legacy_Time = Summarize(Kraken, Labels, Report, os.path.join(Folder, 'legacy_data.list'), Legacy=True)
+            New_Time = Summarize(Kraken, Labels, Report, os.path.join(Folder, 'data.list'))
+            if open(os.path.join(Folder, 'legacy_data.list')).read() != open(os.path.join(Folder, 'data.list')).read():
+                sys.exit('ERROR: summary of ' + str(reference) + ' contigs differs from the original summary')
+            print('{} contigs: original {:.3f}s, summary {:.3f}s ({:.1f}x), output identical'.format(reference, Legacy_Time, New_Time, Legacy_Time / New_Time))
+        Kraken, Labels, Report = Synthetic_Assembly(Folder, contigs)
+        New_Time = Summarize(Kraken, Labels, Report, os.path.join(Folder, 'data.list'))
+        print('{} contigs: summary {:.3f}s'.format(contigs, New_Time))
+    finally:
+        shutil.rmtree(Folder)
+    if max_seconds is not None and New_Time > max_seconds:
+        sys.exit('ERROR: summary of ' + str(contigs) + ' contigs took longer than ' + str(max_seconds) + 's')
+
+if __name__ == '__main__':
+    args = parseArgs()
+    Benchmark(args.contigs, args.reference, args.max_seconds)
@@ -19,6 +19,7 @@ import glob
 from Bio import SeqIO
 import argparse
 from decimal import Decimal, ROUND_HALF_UP
+from Kraken_Assembly_Reader import Read_Kraken_Assembly, Write_Weighted_Kraken
 
 def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to summarize the kraken output files for weighted versions')
@@ -45,76 +46,16 @@ def In_Line(value, line_string):
         return False
 
 def String_Converter(Input_String):
-    Counter = 0
-    Character = Input_String[0]
-    Current_String = ''
-    Out_List = []
-    while Counter < len(Input_String):
-        if Character == '\n':
-            Out_List.append(Current_String)
-            return Out_List
-        elif Character == '\t':
-            Out_List.append(Current_String)
-            Current_String = ''
-            Counter = Counter + 1
-            Character = Input_String[Counter]
-        else:
-            Current_String = Current_String + Character
-            Counter = Counter + 1
-            Character = Input_String[Counter]
+    """Splits a line on tabs, up to its newline"""
+    return Input_String.split('\n', 1)[0].split('\t')
 
 def Translated_Line_Converter(Input_String):
-    Counter = 0
-    Character = Input_String[0]
-    Current_String = ''
-    Out_List = []
-    while Counter < len(Input_String):
-        if Character == '\n':
-            Out_List.append(Current_String)
-            return Out_List
-        elif Character == '\t' or Character == ';':
-            Out_List.append(Current_String)
-            Current_String = ''
-            Counter = Counter + 1
-            Character = Input_String[Counter]
-        else:
-            Current_String = Current_String + Character
-            Counter = Counter + 1
-            Character = Input_String[Counter]
-
-def Minimum_Contig(input_kraken):
-    f = open(input_kraken, 'r')
-    String1 = f.readline()
-    List1 = String_Converter(String1)
-    Minimum = int(List1[3])
-    while String1 != '':
-        List1 = String_Converter(String1)
-        if Minimum > int(List1[3]):
-            Minimum = int(List1[3])
-            String1 = f.readline()
-        else:
-            String1 = f.readline()
-    f.close()
-    return Minimum
+    """Splits a translated kraken line into the contig name and each taxon of its lineage, up to its newline"""
+    return Input_String.split('\n', 1)[0].replace(';', '\t').split('\t')
 
 def Kraken_Assembly_Converter(input_kraken, output_kraken):
-    """Reads in a kraken input file and an input fasta and makes a bp weighted kraken file"""
-    Min_Length = Minimum_Contig(input_kraken)
-    f = open(input_kraken, 'r')
-    g = open(output_kraken, 'w')
-    String1 = f.readline()
-    while String1 != '':
-        List1 = String_Converter(String1)
-        Count = int(round(float(List1[3]) // Min_Length))
-        Out_Line = ''
-        for items in List1[0:4]:
-            Out_Line = Out_Line + items + '\t'
-        Out_Line = Out_Line[0:-1] + '\n'
-        for numbers in range(Count):
-            g.write(Out_Line)
-        String1 = f.readline()
-    f.close()
-    g.close()
+    """Reads in a kraken input file and makes a bp weighted kraken file"""
+    Write_Weighted_Kraken(Read_Kraken_Assembly(input_kraken), output_kraken)
 
 def Summary_Taxonomy(input_line):
     Output = ''
@@ -128,70 +69,36 @@ def Summary_Taxonomy(input_line):
         else:
             Output = Output + characters
 
-def Kraken_Assembly_Lengths(input_kraken):
-    Output_List = []
-    f = open(input_kraken, 'r')
-    String1 = f.readline()
-    while String1 != '':
-        List1 = String_Converter(String1)
-        Entry = []
-        Entry.append(List1[1])
-        Entry.append(List1[3])
-        Output_List.append(Entry)
-        String1 = f.readline()
-    f.close()
-    return Output_List
-
-def Kraken_Assembly_Unclassified(input_kraken):
-    Length = 0
-    f = open(input_kraken)
-    String1 = f.readline()
-    while String1 != '':
-        List1 = String_Converter(String1)
-        if List1[2] == '0':
-            Length = Length + int(List1[3])
-        String1 = f.readline()
-    f.close()
-    return Length
-
-def Total_Length(input_kraken):
-    f = open(input_kraken)
-    Length = 0
-    String1 = f.readline()
-    while String1 != '':
-        List1 = String_Converter(String1)
-        Length = Length + int(List1[3])
-        String1 = f.readline()
-    f.close()
-    return Length
-
-
-
-def Taxonomy_Totals(untranslated_kraken, translated_kraken):
-    Contig_Lengths = Kraken_Assembly_Lengths(untranslated_kraken)
+def Taxonomy_Totals(Assembly, translated_kraken):
+    """Lists [taxon, contig length, length classified to exactly that taxon] for every taxon in each translated contig's
+    lineage, from the untranslated kraken file's Kraken_Assembly. Contig lengths are looked up by name so each translated
+    line is matched without rescanning the contigs"""
+    Contig_Lengths = {}
+    for contigs in Assembly.Lengths():
+        if contigs[0] in Contig_Lengths:
+            Contig_Lengths[contigs[0]].append(contigs[1])
+        else:
+            Contig_Lengths[contigs[0]] = [contigs[1]]
     f = open(translated_kraken, 'r')
     Entry_List = []
     String1 = f.readline()
     while String1 != '':
         List1 = Translated_Line_Converter(String1)
-        for contigs in Contig_Lengths:
-            if contigs[0] == List1[0]:
-                for classes in range(1, (len(List1) - 1)):
-                    Class = []
-                    Class.append(List1[classes])
-                    Class.append(contigs[1])
-                    Class.append(0)
-                    Entry_List.append(Class)
+        for Length in Contig_Lengths.get(List1[0], []):
+            for classes in range(1, (len(List1) - 1)):
                 Class = []
-                Class.append(List1[len(List1) - 1])
-                Class.append(contigs[1])
-                Class.append(contigs[1])
+                Class.append(List1[classes])
+                Class.append(Length)
+                Class.append(0)
                 Entry_List.append(Class)
-            else:
-                continue
+            Class = []
+            Class.append(List1[len(List1) - 1])
+            Class.append(Length)
+            Class.append(Length)
+            Entry_List.append(Class)
         String1 = f.readline()
     f.close()
-    Unclassified_Length = Kraken_Assembly_Unclassified(untranslated_kraken)
+    Unclassified_Length = Assembly.Unclassified
     Unclassified = ['unclassified']
     Unclassified.append(str(Unclassified_Length))
     Unclassified.append(str(Unclassified_Length))
@@ -199,17 +106,17 @@ def Taxonomy_Totals(untranslated_kraken, translated_kraken):
     return Entry_List
 
 def List_Combiner(input_list):
+    """Sums the lengths of entries for the same taxon, keeping taxa in the order they first appear"""
     Output_List = []
-    Output_List.append(input_list[0])
-    for items in range(1, len(input_list)):
-        Match = 0
-        for entries in Output_List:
-            if input_list[items][0] == entries[0]:
-                entries[1] = str(int(entries[1]) + int(input_list[items][1]))
-                entries[2] = str(int(entries[2]) + int(input_list[items][2]))
-                Match = 1
-        if Match == 0:
-            Output_List.append(input_list[items])
+    Taxa = {}
+    for items in input_list:
+        entries = Taxa.get(items[0])
+        if entries is None:
+            Taxa[items[0]] = items
+            Output_List.append(items)
+        else:
+            entries[1] = str(int(entries[1]) + int(items[1]))
+            entries[2] = str(int(entries[2]) + int(items[2]))
     return Output_List
 
 def Two_Decimal_Percent(number, total):
@@ -220,33 +127,36 @@ def Two_Decimal_Percent(number, total):
 
 def Assembly_Summary(input_summary, input_list, output_summary):
     Total_Length = 0
+    Taxa = {}
     for items in input_list:
         Total_Length = Total_Length + int(items[2])
+        if items[0] not in Taxa:
+            Taxa[items[0]] = items
     f= open(input_summary, 'r')
     g = open(output_summary, 'w')
     String1 = f.readline()
     while String1 != '':
         List1 = String_Converter(String1)
-        for entries in input_list:
-            if entries[0] == Summary_Taxonomy(String1):
-                Out_Line = ''
-                Percent = Two_Decimal_Percent(int(entries[1]), Total_Length)
-                if len(Percent) == 4:
-                    Out_Line = '  ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t' + List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
-                elif len(Percent) == 5:
-                    Out_Line = ' ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
-                elif len(Percent) == 6:
-                    Out_Line = Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
-                g.write(Out_Line)
-                break
+        entries = Taxa.get(Summary_Taxonomy(String1))
+        if entries is not None:
+            Out_Line = ''
+            Percent = Two_Decimal_Percent(int(entries[1]), Total_Length)
+            if len(Percent) == 4:
+                Out_Line = '  ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t' + List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+            elif len(Percent) == 5:
+                Out_Line = ' ' + Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+            elif len(Percent) == 6:
+                Out_Line = Percent + '\t' + entries[1] + '\t' + str(entries[2]) + '\t'+ List1[3] + '\t' + List1[4] + '\t' + List1[5] + '\n'
+            g.write(Out_Line)
         String1 = f.readline()
     f.close()
     g.close()
 
-args = parseArgs()
-List2 = Taxonomy_Totals(args.kraken, args.label)
-List3 = List_Combiner(List2)
-Assembly_Summary(args.list, List3, args.output)
+if __name__ == '__main__':
+    args = parseArgs()
+    List2 = Taxonomy_Totals(Read_Kraken_Assembly(args.kraken), args.label)
+    List3 = List_Combiner(List2)
+    Assembly_Summary(args.list, List3, args.output)
 
 
 ##Kraken_Assembly_Converter(sys.argv[1], sys.argv[2], sys.argv[1][0:-3] + '_BP.in')
@@ -9,26 +9,28 @@
 #
 # Description: A script to submit a list of isolates to the cluster to perform GAMA on many isolates in parallel
 #
-# ./abl_mass_qsub_GAMA.sh -l path_to_list -m max_concurrent_submissions -o output_folder_for_scripts -k clobberness[keep|clobber] [-c path_to_config_file] [-d path_to_alternate_DB]
+# ./abl_mass_qsub_GAMA.sh -l path_to_list -m max_concurrent_submissions -o output_folder_for_scripts -k clobberness[keep|clobber] [-c path_to_config_file] [-d path_to_alternate_DB] [-b]
+#	-b submits one job running GAMA in batch mode over the whole list (gene database indexed once), -m is then the number of blat searches it runs at once
 #
 # Output location: default_config.sh_output_location/run_ID/sample_name/GAMA/. Temp scripts will be in default_mass_qsubs_folder_from_config.sh/GAMA_subs
 #
 # Modules required: None, run_GAMA.sh will load Python3/3.5.2 and blat/35
 #
-# v1.0.2 (09/02/2020)
+# v1.0.3 (10/18/2026)
 #
 # Created by Nick Vlachos (nvx4@cdc.gov)
 #
 
 #  Function to print out help blurb
 show_help () {
-	echo "Usage is ./abl_mass_qsub_GAMA.sh -l path_to_list -m max_concurrent_submissions -o output_folder_for_scripts -k clobberness[keep|clobber] [-c path_to_config_file] [-d path_to alternate_database_location]"
+	echo "Usage is ./abl_mass_qsub_GAMA.sh -l path_to_list -m max_concurrent_submissions -o output_folder_for_scripts -k clobberness[keep|clobber] [-c path_to_config_file] [-d path_to alternate_database_location] [-b]"
 	echo "Output is saved to ${processed}/run_ID/sample_name/GAMA where processed is retrieved from config file, either default or imported"
 }
 
 # Parse command line options
 options_found=0
-while getopts ":h?l:m:k:c:d:o:" option; do
+batch="false"
+while getopts ":h?l:m:k:c:d:o:b" option; do
 	options_found=$(( options_found + 1 ))
 	case "${option}" in
 		\?)
@@ -54,6 +56,9 @@ while getopts ":h?l:m:k:c:d:o:" option; do
 		d)
 			echo "Option -d triggered, argument = ${OPTARG}"
 			alt_db=${OPTARG};;
+		b)
+			echo "Option -b triggered, batch mode activated"
+			batch="true";;
 		:)
 			echo "Option -${OPTARG} requires as argument";;
 		h)
@@ -140,6 +145,49 @@ fi
 
 start_time=$(date "+%m-%d-%Y_at_%Hh_%Mm_%Ss")
 
+# Batch mode, lists every isolate still missing output and submits a single job running GAMA over all of them
+if [[ "${batch}" == "true" ]]; then
+	database_and_version="${ResGANNCBI_srst2_filename}"
+	if [[ "${use_alt_db}" == "true" ]]; then
+		database_basename=$(basename -- "${database_path}")
+		database_and_version=$(echo ${database_basename##*/} | cut -d'_' -f1,2)
+	else
+		database_path="${ResGANNCBI_srst2}"
+	fi
+	batch_list="${main_dir}/GAMAAR_batch_${start_time}.txt"
+	> "${batch_list}"
+	for item in "${arr[@]}"; do
+		sample_name=$(echo "${item}" | cut -d'/' -f2)
+		project=$(echo "${item}" | cut -d'/' -f1)
+		GAMA_output="${processed}/${project}/${sample_name}/GAMA/${sample_name}.${database_and_version}.GAMA"
+		if [[ "${clobberness}" = "clobber" ]]; then
+			rm -f "${GAMA_output}"
+		fi
+		if [[ ! -f "${GAMA_output}" ]]; then
+			mkdir -p "${processed}/${project}/${sample_name}/GAMA"
+			echo -e "${processed}/${project}/${sample_name}/Assembly/${sample_name}_scaffolds_trimmed.fasta\t${GAMA_output}" >> "${batch_list}"
+		else
+			echo "${project}/${sample_name} already has newest GAMA ResGANNCBI ${database_and_version}"
+		fi
+	done
+	if [[ -s "${batch_list}" ]]; then
+		echo -e "#!/bin/bash -l\n" > "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -o GAMAAR_batch.out" >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -e GAMAAR_batch.err" >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -N GAMAAR_batch"   >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -cwd"  >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -pe smp ${max_subs}"  >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "#$ -q all.q\n"  >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "ml blat Python3/3.5.4" >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "cd ${shareScript}" >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		echo -e "python3 GAMA_ResGANNCBI_SciComp_Exe.py -l \"${batch_list}\" -d \"${database_path}\" -s -j ${max_subs}" >> "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		qsub -sync y "${main_dir}/GAMAAR_batch_${start_time}.sh"
+		mv "${shareScript}/GAMAAR_batch.err" ${main_dir}
+		mv "${shareScript}/GAMAAR_batch.out" ${main_dir}
+	fi
+	exit 0
+fi
+
 # Creates and submits qsub scripts to check all isolates on the list against the newest ResGANNCBI DB
 while [ ${counter} -lt ${arr_size} ] ; do
 	sample_name=$(echo "${arr[${counter}]}" | cut -d'/' -f2)
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+
+#
+# Description: c-SSTAR search shared by c-SSTAR_gapped.py and c-SSTAR_ungapped.py, which only differ in whether blastn may open gaps: genome blast
+#	database cache, (sharded) blastn searches, tabular streaming, parsing, cluster best hit selection and tagging, and the batched multi-genome
+#	mode. Run directly to benchmark the parser against the original per row parsing on a synthetic hit table
+#
+# Usage is python3 ./c_SSTAR_blast.py [-n number_of_rows] [-c number_of_clusters] [-S comma_separated_similarities]
+#
+# Output location: standard out (benchmark only)
+#
+# Modules required: None
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import argparse
+import gc
+import hashlib
+import logging
+import os
+import pwd
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
+from c_SSTAR_translate import countInternalStops
+from translate_utils import translateSeq
+
+# Parsed gene name fields for each AR gene id seen so far, the same genes come up in every genome
+_geneParts = {}
+
+class BlastHit(object):
+	'''one row of c-SSTAR blastn output (qseqid sseqid pident length mismatch gaps qstart qend sstart send evalue bitscore qlen slen sseq)
+	split once, with the fields best hit selection needs converted up front'''
+	__slots__ = ('fields', 'geneParts', 'pident', 'length', 'bitscore', 'qlen')
+
+	def __init__(self, fields, geneParts):
+		self.fields = fields
+		self.geneParts = geneParts
+		self.pident = float(fields[2])
+		self.length = int(fields[3])
+		self.bitscore = float(fields[11])
+		self.qlen = int(fields[12])
+
+	def candidate(self):
+		'''the hit as the list tagHit and the output lines of c-SSTAR work with'''
+		f = self.fields
+		geneParts = self.geneParts
+		return [geneParts[0], geneParts[1], geneParts[2], f[1], int(f[2].split('.')[0]), f[3], f[11], f[12], f[6], f[7], f[13], f[14].rstrip(), geneParts[4], geneParts[5], 100 * self.length // self.qlen, f[4]]
+
+def syscall(syscmd):
+	with open(os.devnull) as dump:
+		returncode = subprocess.call(syscmd, stdout=dump, stderr=dump, shell=True)
+		if returncode != 0:
+			logging.error('failed syscall ' + syscmd)
+			sys.exit('ERROR: failed syscall ' + syscmd)
+
+def genomeHash(genome):
+	'''sha256 of the genome file contents, used as the blast database cache key'''
+	digest = hashlib.sha256()
+	with open(genome, 'rb') as infile:
+		for block in iter(lambda: infile.read(1048576), b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+def evictBlastDbs(cacheDir, cacheMb, keep):
+	'''removes least recently used databases (and builds abandoned for over a day) until the cache fits in cacheMb'''
+	entries = []
+	total = 0
+	for name in os.listdir(cacheDir):
+		path = os.path.join(cacheDir, name)
+		if not os.path.isdir(path):
+			continue
+		if name.startswith('.building_'):
+			if time.time() - os.path.getmtime(path) > 86400:
+				shutil.rmtree(path, ignore_errors=True)
+			continue
+		size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+		entries.append((os.path.getmtime(path), size, name))
+		total += size
+	for mtime, size, name in sorted(entries):
+		if total <= cacheMb * 1048576:
+			break
+		if name == keep:
+			continue
+		logging.info('evicting cached blast database ' + name)
+		shutil.rmtree(os.path.join(cacheDir, name), ignore_errors=True)
+		total -= size
+
+def cachedBlastDb(genome, cacheDir, cacheMb):
+	'''returns the cached blast database of genome, building it first if needed. Builds happen in a private folder that is
+	renamed into place when complete, so concurrent jobs on the same genome never see a partial database'''
+	key = genomeHash(genome)
+	entry = os.path.join(cacheDir, key)
+	if os.path.isdir(entry):
+		os.utime(entry, None)
+		logging.info('reusing cached blast database ' + entry)
+		return os.path.join(entry, key)
+	if not os.path.isdir(cacheDir):
+		os.makedirs(cacheDir, exist_ok=True)
+	building = tempfile.mkdtemp(prefix='.building_' + key + '_', dir=cacheDir)
+	# mkdtemp is private to the user, but the cache is shared with the rest of the group
+	os.chmod(building, 0o775)
+	syscall('makeblastdb -in {} -out {} -dbtype nucl'.format(genome, os.path.join(building, key)))
+	try:
+		os.rename(building, entry)
+		logging.info('cached blast database ' + entry)
+	except OSError:
+		# Another job finished the same database first
+		shutil.rmtree(building, ignore_errors=True)
+	evictBlastDbs(cacheDir, cacheMb, key)
+	return os.path.join(entry, key)
+
+def blastnCommand(database, blastDb, similarity, out, gapped=True, threads=1, maxTargets=None):
+	'''builds the blastn search of the AR gene database against the genome blast database, out may be - for stdout. blastn keeps
+	each gene's best contig and culls hits inside better ones, unless maxTargets is given: then up to maxTargets contigs are reported
+	with every hit so genomeRows can apply those limits itself'''
+	ungapped = ''
+	if not gapped:
+		ungapped = ' -ungapped'
+	numThreads = ''
+	if threads > 1:
+		numThreads = ' -num_threads {}'.format(threads)
+	targets = 1
+	culling = ' -culling_limit 1'
+	if maxTargets is not None:
+		targets = maxTargets
+		culling = ''
+	return 'blastn -task blastn -query {0} -db {1} -out {2}{5} -evalue 1e-5 -max_target_seqs {6} -perc_identity {3}{7} -outfmt "6 qseqid sseqid pident length mismatch gaps qstart qend sstart send evalue bitscore qlen slen sseq"{4}'.format(database, blastDb, out, similarity, numThreads, ungapped, targets, culling)
+
+def shardDatabase(database, shards, shardPrefix):
+	'''splits the AR gene FastA into up to shards files of contiguous records, only breaking between clusters so that
+	each cluster's hits stay together and in order for bestHits'''
+	records = []
+	with open(database) as infile:
+		for l in infile:
+			if l.startswith('>'):
+				records.append([l[1:].split('__')[0], l])
+			elif len(records) > 0:
+				records[-1][1] += l
+	target = sum(len(text) for cluster, text in records) / shards
+	shardFiles = []
+	current = []
+	size = 0
+	for n in range(len(records)):
+		cluster, text = records[n]
+		if size >= target and cluster != records[n-1][0] and len(shardFiles) < shards - 1:
+			shardFiles.append(writeShard(current, '{}.shard{}.fasta'.format(shardPrefix, len(shardFiles))))
+			current = []
+			size = 0
+		current.append(text)
+		size += len(text)
+	if len(current) > 0:
+		shardFiles.append(writeShard(current, '{}.shard{}.fasta'.format(shardPrefix, len(shardFiles))))
+	return shardFiles
+
+def writeShard(texts, shardFile):
+	with open(shardFile, 'w') as outfile:
+		outfile.writelines(texts)
+	return shardFile
+
+def quietCall(syscmd):
+	'''runs a command with its output discarded and returns its exit code, for use inside the shard thread pool'''
+	with open(os.devnull) as dump:
+		return subprocess.call(syscmd, stdout=dump, stderr=dump, shell=True)
+
+def shardedRows(database, blastDb, similarity, threads, shardPrefix, gapped=True, maxTargets=None):
+	'''searches each shard of the AR database with its own blastn, threads at a time, and returns all rows in database order'''
+	shardFiles = shardDatabase(database, threads, shardPrefix)
+	commands = [blastnCommand(shardFile, blastDb, similarity, shardFile + '.tsv', gapped, maxTargets=maxTargets) for shardFile in shardFiles]
+	pool = ThreadPool(threads)
+	returncodes = pool.map(quietCall, commands)
+	pool.close()
+	pool.join()
+	rows = []
+	for n in range(len(shardFiles)):
+		if returncodes[n] != 0:
+			logging.error('failed syscall ' + commands[n])
+			sys.exit('ERROR: failed syscall ' + commands[n])
+		with open(shardFiles[n] + '.tsv') as infile:
+			rows.extend(infile)
+		os.remove(shardFiles[n])
+		os.remove(shardFiles[n] + '.tsv')
+	return rows
+
+def blastnRows(syscmd, teeFile=None):
+	'''runs blastn with tabular output sent to stdout and yields its rows as they arrive, optionally copying them to teeFile'''
+	with open(os.devnull, 'w') as dump:
+		blast = subprocess.Popen(syscmd, stdout=subprocess.PIPE, stderr=dump, shell=True, universal_newlines=True)
+		tee = None
+		if teeFile is not None:
+			tee = open(teeFile, 'w')
+		for l in blast.stdout:
+			if tee is not None:
+				tee.write(l)
+			yield l
+		blast.stdout.close()
+		if tee is not None:
+			tee.close()
+		if blast.wait() != 0:
+			logging.error('failed syscall ' + syscmd)
+			sys.exit('ERROR: failed syscall ' + syscmd)
+
+def tsvRows(blastTsv):
+	'''yields the rows of a blastn tsv written to disk'''
+	with open(blastTsv) as infile:
+		for l in infile:
+			yield l
+
+def parseHits(rows):
+	'''yields a BlastHit for each blastn tabular row as the rows arrive'''
+	geneParts = _geneParts
+	for l in rows:
+		if l == '\n' or l == '':
+			continue
+		fields = l.split('\t')
+		parts = geneParts.get(fields[0])
+		if parts is None:
+			parts = fields[0].split('__')
+			geneParts[fields[0]] = parts
+		yield BlastHit(fields, parts)
+
+def loadHits(rows):
+	'''reads all the hits into a list to pick best hits from at several similarities. Hits hold no reference cycles, so the
+	garbage collector is paused while they load rather than rescanning the growing list over and over'''
+	gcWasEnabled = gc.isenabled()
+	gc.disable()
+	try:
+		return list(parseHits(rows))
+	finally:
+		if gcWasEnabled:
+			gc.enable()
+
+def similarityHits(hits, similarity):
+	'''keeps the hits that a search run with -perc_identity similarity would have reported'''
+	return [hit for hit in hits if hit.pident >= similarity]
+
+def bestHits(hits, similarity):
+	'''keeps the best scoring hit of each cluster from hits sorted by query that pass the overlap and similarity cutoffs'''
+	best = None
+	currentClusterNr = '-1'
+	topHits = []
+	for hit in hits:
+		# Special for cdiff project, >20% overlap required
+		if hit.length > hit.qlen / 5:
+		# Original, >40% overlap required
+		#if hit.length > (hit.qlen / 5) * 2:
+			clusterNr = hit.geneParts[0]
+			if clusterNr == currentClusterNr:
+				if best.bitscore < hit.bitscore:
+					best = hit
+			else:
+				if best is not None and int(best.pident) >= similarity:
+					topHits.append(best.candidate())
+				currentClusterNr = clusterNr
+				best = hit
+	if best is not None and int(best.pident) >= similarity:
+		topHits.append(best.candidate())
+	return topHits
+
+def arGeneOrder(database):
+	'''position of each AR gene in the database FastA, which is the order blastn reports them in when they are the queries'''
+	order = {}
+	with open(database) as infile:
+		for l in infile:
+			if l.startswith('>'):
+				order[l[1:].split()[0]] = len(order)
+	return order
+
+def sequenceCount(fasta):
+	'''number of sequences in a FastA, e.g. the contigs of a genome'''
+	with open(fasta) as infile:
+		return sum(1 for l in infile if l.startswith('>'))
+
+def batchQueries(genomes, queryFasta):
+	'''writes the contigs of every genome to one query FastA under short unique ids, returning id -> (genome number, contig id)'''
+	contigs = {}
+	with open(queryFasta, 'w') as outfile:
+		for n in range(len(genomes)):
+			with open(genomes[n]) as infile:
+				for l in infile:
+					if l.startswith('>'):
+						queryId = 'q{}_{}'.format(n, len(contigs))
+						contigs[queryId] = (n, l[1:].split()[0])
+						outfile.write('>' + queryId + '\n')
+					else:
+						outfile.write(l)
+	return contigs
+
+def batchBlastnCommand(queryFasta, blastDb, similarity, out, maxTargets, gapped=True, threads=1):
+	'''builds the blastn search of the batch contigs against the AR gene blast database. Each contig may hit any number of AR genes,
+	so maxTargets should be the number of genes in the database (blastn would otherwise keep only 500), the per genome limits are
+	applied afterwards by genomeRows'''
+	ungapped = ''
+	if not gapped:
+		ungapped = ' -ungapped'
+	return 'blastn -task blastn -query {0} -db {1} -out {2}{5} -evalue 1e-5 -max_target_seqs {6} -perc_identity {3} -num_threads {4} -outfmt "6 qseqid sseqid pident length mismatch gaps qstart qend sstart send evalue bitscore qlen slen qseq"'.format(queryFasta, blastDb, out, similarity, threads, ungapped, maxTargets)
+
+# Complement of every IUPAC nucleotide code in either case, U pairs with A
+COMPLEMENT = str.maketrans('ACGTURYKMBVDHSWNacgturykmbvdhswn', 'TGCAAYRMKVBHDSWNtgcaayrmkvbhdswn')
+
+def reverseComplement(nuclSeq):
+	'''reverse complements an aligned nucleotide sequence, leaving gaps in place'''
+	return nuclSeq.translate(COMPLEMENT)[::-1]
+
+def swapRow(l, contigs):
+	'''turns a contig vs AR gene batch row into the AR gene vs contig fields a per genome search reports, returning (genome number, fields)'''
+	f = l.rstrip('\n').split('\t')
+	n, contig = contigs[f[0]]
+	alignedSeq = f[14]
+	if int(f[8]) <= int(f[9]):
+		geneStart, geneEnd, contigStart, contigEnd = f[8], f[9], f[6], f[7]
+	else:
+		geneStart, geneEnd, contigStart, contigEnd = f[9], f[8], f[7], f[6]
+		alignedSeq = reverseComplement(alignedSeq)
+	return n, [f[1], contig, f[2], f[3], f[4], f[5], geneStart, geneEnd, contigStart, contigEnd, f[10], f[11], f[13], f[12], alignedSeq]
+
+def genomeRows(hits, geneOrder):
+	'''applies -max_target_seqs 1 and -culling_limit 1 to one genome's hits the way a per genome search does (keep the hits on the
+	best contig for each gene, dropping any whose gene range sits inside a higher scoring hit) and returns them as rows in gene order'''
+	byGene = {}
+	for f in hits:
+		byGene.setdefault(f[0], []).append(f)
+	rows = []
+	for gene in sorted(byGene, key=lambda gene: geneOrder[gene]):
+		geneHits = sorted(byGene[gene], key=lambda f: -float(f[11]))
+		kept = []
+		for f in geneHits:
+			if f[1] != geneHits[0][1]:
+				continue
+			if any(int(k[6]) <= int(f[6]) and int(f[7]) <= int(k[7]) for k in kept):
+				continue
+			kept.append(f)
+		rows.extend('\t'.join(f) + '\n' for f in kept)
+	return rows
+
+def batchMain(args, outdir, blastDb, similarities, gapped=True):
+	'''searches every genome in the list at once and writes each genome's c-SSTAR output from its share of the hits'''
+	genomes = []
+	names = []
+	with open(args.list) as infile:
+		for l in infile:
+			if l.strip() == '':
+				continue
+			fields = l.rstrip('\n').split('\t')
+			genomes.append(fields[0])
+			if len(fields) > 1 and fields[1] != '':
+				names.append(fields[1])
+			else:
+				names.append(os.path.splitext(os.path.basename(fields[0]))[0])
+	logging.info('batch of {} genomes'.format(len(genomes)))
+	queryFasta = os.path.join(outdir, 'c-SSTAR_batch_{}.fasta'.format(os.getpid()))
+	contigs = batchQueries(genomes, queryFasta)
+	geneOrder = arGeneOrder(args.database)
+	hits = [[] for genome in genomes]
+	for l in blastnRows(batchBlastnCommand(queryFasta, blastDb, similarities[0], '-', max(1, len(geneOrder)), gapped, args.threads)):
+		n, fields = swapRow(l, contigs)
+		hits[n].append(fields)
+	os.remove(queryFasta)
+	for n in range(len(genomes)):
+		genomeHits = loadHits(genomeRows(hits[n], geneOrder))
+		for sim in similarities:
+			if len(similarities) == 1:
+				outputFile = os.path.join(outdir, names[n] + '.sstar')
+			else:
+				outputFile = os.path.join(outdir, '{}_{}.sstar'.format(names[n], sim))
+			with open(outputFile, 'w') as outfile:
+				for i in bestHits(similarityHits(genomeHits, sim), sim):
+					outfile.write(hitLine(tagHit(i, args.edge)) + '\n')
+
+def internalSTOPcodon(candidate):
+	'''counts number of internal stop codons; requires sequence from database to be in frame'''
+	if '-' in candidate[11]:
+		nucSeq = candidate[11].replace('-', '')
+	else:
+		nucSeq = candidate[11]
+	if int(int(candidate[8])%3) == 1:
+		frameStart = int(0)
+	elif int(int(candidate[8])%3) == 0:
+		frameStart = int(1)
+	elif int(int(candidate[8])%3) == 2:
+		frameStart = int(2)
+	if frameStart > 0:
+		nucSeq = nucSeq[frameStart:]
+	if len(nucSeq)%3 == 0:
+		protein = translateSeq(nucSeq)
+	elif len(nucSeq)%3 > 0:
+		protein = translateSeq(nucSeq[:-(len(nucSeq)%3)])
+	else:
+		sys.exit('ERROR: incorrect nucleotide length ({}) after trimming'.format(len(nucSeq)))
+	numInternalSTOPcodons = countInternalStops(protein)
+	return (protein, str(numInternalSTOPcodons))
+
+def tagHit(l, edge):
+	if int(l[5]) != int(l[7]):  #incomplete len; SRST2='? indicates that there was uncertainty in at least one of the alleles'
+		l = [ l[0], l[1]+'?', l[2]+'?', l[3], l[4], l[5], l[6], l[7], l[8], l[9], l[10], l[11], l[12], l[13], l[14], l[15] ]
+	if int(l[5]) == int(l[7]) and int(l[4]) < 100:  #full length match but pident!=100%; SRST2='* [...] indicates that there were mismatches against at least one of the alleles. This suggests that you have a novel variant [...] rather than a precise match'
+		l = [ l[0], l[1]+'*', l[2]+'*', l[3], l[4], l[5], l[6], l[7], l[8], l[9], l[10], l[11], l[12], l[13], l[14], l[15]]
+	if (int(l[8]) - edge) < 0:  #Test for edge hits on left edge
+		if (int(l[7]) - int(l[9])) > 0:  #require incomplete alignlen at edge for '$' designation (distinguishing ^ from $ is not necessary so KISS)
+			l = [ l[0], l[1]+'$', l[2]+'$', l[3], l[4], l[5], l[6], l[7], l[8], l[9], l[10], l[11], l[12], l[13], l[14], l[15] ]
+	if (int(l[9]) + edge) > int(l[10]):  #Test for edge hits on right edge
+		if (int(l[7]) + int(l[8])) > int(l[10]):  #require incomplete alignlen
+			l = [ l[0], l[1]+'$', l[2]+'$', l[3], l[4], l[5], l[6], l[7], l[8], l[9], l[10], l[11], l[12], l[13], l[14], l[15] ]
+	(prot, numSTOP) = internalSTOPcodon(l)
+	if int(numSTOP) > 0:  #TR indicates 'truncated protein translation'
+		l = [ l[0], l[1]+'-TRUNC', l[2]+'-TRUNC', l[3], l[4], l[5], l[6], l[7], l[8], l[9], l[10], l[11], l[12], l[13], l[14], l[15] ]
+	return l
+
+def hitLine(hit):
+	'''formats a tagged hit as a line of c-SSTAR output'''
+	# Reports numbers of mismatches at the end
+	#return (str(hit[13]) + '\t' + str(hit[12]) + '\t' + hit[1] + '\t' + hit[2] + '\t' + hit[3] + '\t' + str(hit[4]) + '%\t' + str(hit[5]) + '\t' + str(hit[7]) + '\t' + str(hit[14]) + '\t' + str(hit[15]))
+	# Does not report SNPs at the end
+	return (str(hit[13]) + '\t' + str(hit[12]) + '\t' + hit[1] + '\t' + hit[2] + '\t' + hit[3] + '\t' + str(hit[4]) + '%\t' + str(hit[5]) + '\t' + str(hit[7]) + '\t' + str(hit[14]))
+
+def runSstar(args, version, gapped=True):
+	'''runs c-SSTAR on the parsed arguments of c-SSTAR_gapped.py or c-SSTAR_ungapped.py, gapped picks which search it is'''
+	outdir = args.outdir
+	genome = args.genome
+	if args.basename is not None:
+		baseGenome = args.basename
+	elif args.list is not None:
+		baseGenome = os.path.splitext(os.path.basename(args.list))[0]
+	else:
+		baseGenome = os.path.splitext(os.path.basename(genome))[0]
+	if not os.path.exists(outdir):
+		os.mkdir(outdir)
+	logging.basicConfig(filename='{}/c-SSTAR_{}.log'.format(outdir, baseGenome), format='%(asctime)s: %(levelname)s: %(message)s', datefmt='%d-%m-%Y %I:%M:%S %p', level=logging.INFO)
+	logging.info('c-SSTAR version: {}'.format(version))
+	logging.info('user: {}'.format(pwd.getpwuid(os.getuid()).pw_name))
+	logging.info('release: {}'.format(os.uname()[3]))
+	logging.info('shell env: {}'.format(pwd.getpwuid(os.getuid()).pw_shell))
+	logging.info('cwd: {}'.format(pwd.getpwuid(os.getuid()).pw_dir))
+	logging.info('python version: {}'.format(sys.version))
+	logging.info(subprocess.check_output('command -v blastn', shell=True).rstrip())
+	logging.info(subprocess.check_output('blastn -version | tail -n1', shell=True).rstrip())
+	database = args.database
+	similarity = args.similarity
+#	print("in:",genome,"out-",os.path.join(outdir, baseGenome))
+	if args.list is not None:
+		similarities = [similarity]
+		if args.similarities is not None:
+			similarities = sorted(set(int(sim) for sim in args.similarities.split(',')))
+		# The AR genes become the database, built once (or taken from the cache) for the whole batch
+		if args.cache_dir is not None:
+			blastDb = cachedBlastDb(database, args.cache_dir, args.cache_mb)
+		else:
+			blastDb = os.path.join(outdir, baseGenome + '_ARdb')
+			syscall('makeblastdb -in {} -out {} -dbtype nucl'.format(database, blastDb))
+		batchMain(args, outdir, blastDb, similarities, gapped)
+		if args.cache_dir is None:
+			os.remove(blastDb + '.nin')
+			os.remove(blastDb + '.nsq')
+			os.remove(blastDb + '.nhr')
+		return
+	if args.cache_dir is not None:
+		blastDb = cachedBlastDb(genome, args.cache_dir, args.cache_mb)
+	else:
+		blastDb = os.path.join(outdir, baseGenome)
+		syscall('makeblastdb -in {} -out {} -dbtype nucl'.format(genome, blastDb))
+	maxTargets = None
+	if args.similarities is not None:
+		similarities = sorted(set(int(sim) for sim in args.similarities.split(',')))
+		similarity = similarities[0]
+		logging.info('single search at {}% reported at {}%'.format(similarity, ', '.join(str(sim) for sim in similarities)))
+		# blastn's best contig and culling at the lowest identity can drop hits that a search at a higher identity would keep,
+		# so the search reports every contig and genomeRows applies those limits at each identity instead
+		maxTargets = max(1, sequenceCount(genome))
+	blastTsv = os.path.join(outdir, baseGenome + '.blastn.tsv')
+	if args.shard and args.threads > 1:
+		rows = shardedRows(database, blastDb, similarity, args.threads, os.path.join(outdir, baseGenome), gapped, maxTargets)
+		if not args.pipe or args.keep_tsv:
+			with open(blastTsv, 'w') as outfile:
+				outfile.writelines(rows)
+	elif args.pipe:
+		teeFile = None
+		if args.keep_tsv:
+			teeFile = blastTsv
+		rows = blastnRows(blastnCommand(database, blastDb, similarity, '-', gapped, args.threads, maxTargets), teeFile)
+	else:
+		syscall(blastnCommand(database, blastDb, similarity, blastTsv, gapped, args.threads, maxTargets))
+		rows = tsvRows(blastTsv)
+	if args.similarities is None:
+		topHits = bestHits(parseHits(rows), similarity)
+	else:
+		hits = [l.rstrip('\n').split('\t') for l in rows if l.strip() != '']
+		# blastn reports the AR genes in database order
+		geneOrder = {}
+		for f in hits:
+			geneOrder.setdefault(f[0], len(geneOrder))
+	if args.cache_dir is None:
+		os.remove(blastDb + '.nin')
+		os.remove(blastDb + '.nsq')
+		os.remove(blastDb + '.nhr')
+	if args.similarities is None:
+		for i in topHits:
+			print (hitLine(tagHit(i, args.edge)))
+	else:
+		outputPattern = args.output_pattern
+		if outputPattern is None:
+			outputPattern = os.path.join(outdir, baseGenome + '_{}.sstar')
+		for sim in similarities:
+			simHits = loadHits(genomeRows([f for f in hits if float(f[2]) >= sim], geneOrder))
+			with open(outputPattern.format(sim), 'w') as outfile:
+				for i in bestHits(simHits, sim):
+					outfile.write(hitLine(tagHit(i, args.edge)) + '\n')
+
+def _legacyBestHits(rows, similarity):
+	'''the per row parsing c-SSTAR used before this module, kept as the benchmark reference'''
+	best = ['-1','a','a','a',0,'-1','a',0,'a','a',0, 'a']
+	currentClusterNr = '-1'
+	topHits = []
+	for l in rows:
+		blastOut = [x for x in l.split('\t')]
+		thresHold = (int(blastOut[12])/5)
+		if int(blastOut[3]) > thresHold:
+			enzymeParts = [s for s in blastOut[0].split('__')]
+			clusterNr = enzymeParts[0]
+			ident, dec = blastOut[2].split('.')
+			pident = int(ident)
+			bitscore = blastOut[11]
+			candidate = [clusterNr, enzymeParts[1], enzymeParts[2], blastOut[1] , pident, blastOut[3], bitscore, blastOut[12], blastOut[6], blastOut[7], blastOut[13], blastOut[14].rstrip(), enzymeParts[4] , enzymeParts[5], int(100*int(blastOut[3])//int(blastOut[12])), blastOut[4]]
+			if clusterNr == currentClusterNr:
+				if float(best[6]) < float(candidate[6]):
+					best = candidate
+			else:
+				if best[4] >= similarity:
+					topHits.append(best)
+				currentClusterNr = clusterNr
+				best = candidate
+	if best[4] >= similarity:
+		topHits.append(best)
+	return topHits
+
+def syntheticRows(numRows, numClusters, seed=1):
+	'''makes a query sorted hit table shaped like c-SSTAR blastn output against ResGANNCBI, four alleles per cluster'''
+	random.seed(seed)
+	rows = []
+	for n in range(numRows):
+		block = n * numClusters * 4 // numRows
+		clusterNr = 1 + block // 4
+		qlen = [300, 600, 861, 1200][clusterNr % 4]
+		length = random.randint(qlen // 6, qlen)
+		sstart = random.randint(1, 50000)
+		rows.append('{0}__gene{0}__gene{0}_{1}__{2}__Res{3}__ResGANNCBI\tNODE_{4}_length_90000_cov_20.1\t{5:.3f}\t{6}\t{7}\t0\t1\t{6}\t{8}\t{9}\t1e-50\t{10}.0\t{11}\t90000\t{12}\n'.format(clusterNr, block % 4, block, clusterNr % 9, random.randint(1, 80), random.choice([80.5, 95.12, 98.0, 99.5, 100.0]), length, random.randint(0, 9), sstart, sstart + length - 1, random.randint(100, 2000), qlen, 'ACGT' * (length // 4)))
+	return rows
+
+def benchmark(numRows, numClusters, similarities, repeats=3):
+	'''times the legacy and shared parsers picking the best hits from the same synthetic table (best of repeats), streaming for a
+	single similarity and the way -S reports several cutoffs from one search otherwise, and checks they pick the same hits'''
+	rows = syntheticRows(numRows, numClusters)
+	legacyTime = None
+	sharedTime = None
+	for r in range(repeats):
+		start = time.time()
+		if len(similarities) == 1:
+			legacy = [_legacyBestHits(rows, similarities[0])]
+		else:
+			legacy = [_legacyBestHits([l for l in rows if float(l.split('\t')[2]) >= sim], sim) for sim in similarities]
+		elapsed = time.time() - start
+		if legacyTime is None or elapsed < legacyTime:
+			legacyTime = elapsed
+		_geneParts.clear()
+		start = time.time()
+		if len(similarities) == 1:
+			shared = [bestHits(parseHits(rows), similarities[0])]
+		else:
+			hits = loadHits(rows)
+			shared = [bestHits(similarityHits(hits, sim), sim) for sim in similarities]
+		elapsed = time.time() - start
+		if sharedTime is None or elapsed < sharedTime:
+			sharedTime = elapsed
+	for n in range(len(similarities)):
+		if legacy[n] != shared[n]:
+			sys.exit('ERROR: shared parser picked different hits than the legacy parser at {}%'.format(similarities[n]))
+		print('{}%: {} hits identical'.format(similarities[n], len(shared[n])))
+	print('{} rows at {}%: legacy {:.3f}s, shared {:.3f}s ({:.2f}x)'.format(numRows, ','.join(str(sim) for sim in similarities), legacyTime, sharedTime, legacyTime / sharedTime))
+
+def parseArgs(args=None):
+	parser = argparse.ArgumentParser(description='Benchmark the shared c-SSTAR blastn parser against the original per row parsing')
+	parser.add_argument('-n', '--rows', type=int, default=1000000, help='number of rows in the synthetic hit table [default: 1000000]')
+	parser.add_argument('-c', '--clusters', type=int, default=2000, help='number of AR gene clusters in the synthetic hit table [default: 2000]')
+	parser.add_argument('-S', '--similarities', default='80,95,98', help='comma separated similarity cutoffs to pick best hits at [default: 80,95,98]')
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parseArgs()
+	benchmark(args.rows, args.clusters, [int(sim) for sim in args.similarities.split(',')])
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+#
+# Description: Internal stop codon counting for c-SSTAR hits translated with the codon table of translate_utils.py, without Biopython.
+#	Run directly to benchmark it against Biopython translation on synthetic hits and check both tag the same hits as truncated
+#
+# Usage is python3 ./c_SSTAR_translate.py [-n number_of_hits] [-s stop_codon_rate]
+#
+# Output location: standard out (benchmark only)
+#
+# Modules required: None (numpy is used when available, Biopython only for the benchmark)
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import argparse
+import itertools
+import random
+import re
+import sys
+import time
+from translate_utils import translateSeq
+
+# A stop followed by another residue, the same internal stop c-SSTAR has always counted
+INTERNAL_STOP = re.compile(rb'\*[ABCDEFGHIKLMNPQRSTVWYZ]')
+
+def countInternalStops(protein):
+	'''counts stops in a protein (string) that are followed by another residue'''
+	return len(INTERNAL_STOP.findall(protein.encode()))
+
+def _biopythonTranslate(nuclSeq):
+	'''the Biopython translation c-SSTAR used before this module, kept as the benchmark reference'''
+	from Bio.Seq import Seq
+	return str(Seq(nuclSeq).translate(cds=False, to_stop=False, stop_symbol='*'))
+
+def syntheticHits(numHits, stopRate, seed=1):
+	'''makes in frame hit sequences 300-1200 bp long of random sense codons, with internal stops and ambiguous bases at stopRate'''
+	random.seed(seed)
+	senseCodons = [''.join(codon) for codon in itertools.product('TCAG', repeat=3) if ''.join(codon) not in ['TAA', 'TAG', 'TGA']]
+	hits = []
+	for n in range(numHits):
+		codons = [random.choice(senseCodons) for c in range(random.randint(100, 400))]
+		if random.random() < stopRate:
+			codons[random.randrange(len(codons) - 1)] = random.choice(['TAA', 'TAG', 'TGA'])
+		if random.random() < stopRate:
+			codons[random.randrange(len(codons))] = random.choice(['NNN', 'TAR', 'GCN', 'RAY', 'TAN', 'acg'])
+		hits.append(''.join(codons))
+	return hits
+
+def benchmark(numHits, stopRate, repeats=3):
+	'''times Biopython and table translation of the same synthetic hits (best of repeats) and checks both count the same internal stops'''
+	hits = syntheticHits(numHits, stopRate)
+	biopythonTime = None
+	tableTime = None
+	for r in range(repeats):
+		start = time.time()
+		biopython = [len(INTERNAL_STOP.findall(_biopythonTranslate(hit).encode())) for hit in hits]
+		elapsed = time.time() - start
+		if biopythonTime is None or elapsed < biopythonTime:
+			biopythonTime = elapsed
+		start = time.time()
+		table = [countInternalStops(translateSeq(hit)) for hit in hits]
+		elapsed = time.time() - start
+		if tableTime is None or elapsed < tableTime:
+			tableTime = elapsed
+	if biopython != table:
+		sys.exit('ERROR: table translation counted different internal stops than Biopython')
+	print('{} hits, {} tagged TRUNC by both'.format(numHits, sum(1 for stops in table if stops > 0)))
+	print('Biopython {:.3f}s, table {:.3f}s ({:.2f}x)'.format(biopythonTime, tableTime, biopythonTime / tableTime))
+
+def parseArgs(args=None):
+	parser = argparse.ArgumentParser(description='Benchmark table driven c-SSTAR translation against Biopython')
+	parser.add_argument('-n', '--hits', type=int, default=20000, help='number of synthetic hit sequences [default: 20000]')
+	parser.add_argument('-s', '--stop_rate', type=float, default=0.1, help='fraction of hits given an internal stop codon [default: 0.1]')
+	return parser.parse_args()
+
+if __name__ == '__main__':
+	args = parseArgs()
+	benchmark(args.hits, args.stop_rate)
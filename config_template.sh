@@ -161,6 +161,9 @@ csstar_medium=95
 csstar_low=80
 # Change to your liking
 csstar_other=40
+# Folder to keep genome blast databases in so reruns at other identities skip makeblastdb, and its maximum size in MB
+csstar_blastdb_cache="${mass_qsub_folder}/csstar_blastdb_cache"
+csstar_blastdb_cache_mb=20000
 
 ##### c-SSTAR standard settings #####
 argannot_srst2=$(find ${local_DBs}/star/argannot_*_srst2.fasta -maxdepth 1 -type f -printf '%p\n' | sort -k2,2 -rt '_' -n | head -n 1)
@@ -194,6 +197,11 @@ kraken_full_db="${scicomp_DBs}/kraken/1.0.0/kraken_db/"
 kraken2_mini_db="${local_DBs}/minikraken2DB/"
 #kraken_mini_db="/scicomp/agave/execution/database/public/references/organizations/CDC/NCEZID/kraken/cdc-20171227"
 kraken2_full_db="${scicomp_DBs}/kraken/2.0.0/kraken_db/"
+# NCBI taxdump (nodes.dmp, names.dmp, merged.dmp) the kraken2 python scripts look taxIDs up in instead of entrez, taxonomy.cache is built beside it on first use
+ncbi_taxonomy="${local_DBs}/taxonomy/"
+# sqlite cache of lineages the kraken2 python scripts fetch from entrez when there is no local taxonomy. sqlite locking is unreliable on NFS,
+# so it must be on a node local disk (never the home folder or a share), jobs on the same node share it
+kraken2_lineage_cache="/tmp/kraken2_lineages_${USER}.sqlite"
 ### MOVE THESE TO SHARE/DBS
 # Kraken normal, specially made by Tom with bacteria,archae, and viruses
 # kraken_db="/scicomp/groups/OID/NCEZID/DHQP/CEMB/databases/kraken_BAV_17/"
@@ -3,11 +3,11 @@
 #
 # Description: Script to convert kraken2 file to list file
 #
-# Usage: python3 ./kraken2_report_from_kraken.py -i input_kraken2_file -o output_list_filename
+# Usage: python3 ./kraken2_report_from_kraken.py -i input_kraken2_file -o output_list_filename [-t taxdump_folder] [--cache lineage_cache.sqlite] [--cache_days days] [--cache_size entries] [--no_cache] [--entrez_url url] [--entrez_batch taxIDs_per_request] [--api_key NCBI_API_key]
 #
 # Output location: parameter
 #
-# Modules required: Biopython must be available in python instance
+# Modules required: None
 #
 # v1.0 (10/3/2019)
 #
@@ -17,8 +17,7 @@
 import sys
 import glob
 import fileinput
-import getpass
-from Bio import Entrez
+from kraken2_taxonomy import load_taxonomy, fetch_taxon_records, fetch_taxon_records_batch, kraken_taxIDs, add_cache_arguments, add_entrez_arguments, open_lineage_cache, Entrez_Taxonomy
 import argparse
 from operator import attrgetter
 
@@ -27,6 +26,9 @@ def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to convert kraken2 file to list')
 	parser.add_argument('-i', '--input', required=True, help='input kraken2 filename')
 	parser.add_argument('-o', '--output', required=True, help='output list filename')
+	parser.add_argument('-t', '--taxonomy', help='local NCBI taxdump folder (nodes.dmp, names.dmp) or taxonomy cache to look taxIDs up in, entrez is only asked for taxIDs it does not have')
+	add_cache_arguments(parser)
+	add_entrez_arguments(parser)
 	return parser.parse_args()
 
 # Class to represent a taxonomic node
@@ -203,16 +205,14 @@ class taxon_Node:
 #end of the class definition
 
 # Gets taxonomic info from entrez and adds it to the file formatted in mpa format
-def get_mpa_string_From_NCBI(taxID):
+def get_mpa_string_From_NCBI(taxID, result=None):
 	if taxID == 0:
 		return "|0:unclassified:U"
 	elif taxID == 1:
 		return "|1:root:-"
-	Entrez.email = getpass.getuser()
-	#Creates the data structure from a pull from entrez nucleotide database using accession id with return type of genbank text mode
-	handle = Entrez.efetch(db="taxonomy", id=taxID, mode="text", rettype="xml")
-	#Parses the returned output into lines
-	result= Entrez.read(handle)
+	#Gets the taxon records from the local taxonomy if one was given, the lineage cache or entrez otherwise, unless already fetched
+	if result is None:
+		result=fetch_taxon_records(taxID, taxonomy, cache, entrez)
 	#Will have to change this region to be able to handle more descriptive lists downstream
 	recognized_ranks={"cellular organisms":"-", "superkingdom":"d", "kingdom":"k", "phylum":"p", "class":"c", "order":"o", "family":"f", "genus":"g", "species":"s"}
 	for entry in result:
@@ -233,6 +233,8 @@ def get_mpa_string_From_NCBI(taxID):
 
 # Orders the list based on read counts
 def order_list(input_kraken, output_list):
+	# Looks every distinct taxID up before going through the contigs, so entrez gets a few batched requests instead of one per taxID
+	taxon_records=fetch_taxon_records_batch(kraken_taxIDs(input_kraken), taxonomy, cache, entrez)
 	kraken=open(input_kraken,'r')
 	line=kraken.readline().strip()
 	mpa_dict={}
@@ -244,7 +246,7 @@ def order_list(input_kraken, output_list):
 		contig_taxID = line_sections[2]
 		if contig_taxID not in mpa_dict.keys():
 			print("Adding", contig_taxID)
-			mpa_dict[contig_taxID]=get_mpa_string_From_NCBI(contig_taxID)
+			mpa_dict[contig_taxID]=get_mpa_string_From_NCBI(contig_taxID, taxon_records[contig_taxID])
 			mpa_counts[contig_taxID]=1
 		else:
 			if contig_taxID not in mpa_counts.keys():
@@ -386,5 +388,13 @@ def make_node_tree():
 #get_mpa_string_From_NCBI(470, blank_dick)
 
 args = parseArgs()
+# Looks taxIDs up in the local taxonomy when one is given (entrez for any it lacks), the lineage cache then entrez otherwise
+taxonomy=None
+cache=None
+entrez=Entrez_Taxonomy(args.entrez_url, args.entrez_batch, args.api_key)
+if args.taxonomy is not None:
+	taxonomy=load_taxonomy(args.taxonomy)
+else:
+	cache=open_lineage_cache(args)
 order_list(args.input, args.output)
 #make_node_tree()
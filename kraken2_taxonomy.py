@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+
+#
+# Description: Local NCBI taxonomy and entrez lineage cache shared by the kraken2 scripts. Loads nodes.dmp/names.dmp (and merged.dmp) from an NCBI taxdump into
+#	parent, rank code and name arrays indexed by taxID, saved beside the dump as a cache that later runs memory map instead of parsing.
+#	Lineages come from walking the parent array, so lookups need no network and take time proportional to the taxon's depth. Without a
+#	local taxonomy, lineages fetched from entrez (in throttled batches) are kept in an sqlite cache shared between runs. The cache relies on
+#	sqlite's file locking, which NFS and other network file systems don't reliably provide, so it has to sit on a disk local to the node
+#	(/tmp by default, kraken2_lineage_cache in config.sh) and is only shared by the jobs running on that node
+#
+# Usage: python3 ./kraken2_taxonomy.py -t taxdump_folder_or_cache_file [-i taxID [taxID ...]] [-s port]
+#	(builds or refreshes the cache, prints the lineage of any taxIDs given and can serve them as a stand in for entrez, the kraken2 scripts import it)
+#
+# Output location: taxdump_folder/taxonomy.cache, lineages to standard out
+#
+# Modules required: None
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import os
+import json
+import mmap
+import time
+import struct
+import sqlite3
+import getpass
+import argparse
+import tempfile
+import http.server
+import urllib.parse
+import urllib.request
+from array import array
+from xml.etree import ElementTree
+
+# Parse all arguments from command line
+def parseArgs(args=None):
+	parser = argparse.ArgumentParser(description='Script to build the local NCBI taxonomy cache used by the kraken2 scripts')
+	parser.add_argument('-t', '--taxonomy', required=True, help='NCBI taxdump folder (nodes.dmp, names.dmp) or taxonomy cache file')
+	parser.add_argument('-i', '--taxIDs', nargs='*', default=[], help='taxIDs to print the lineage of')
+	parser.add_argument('-s', '--serve', type=int, help='serve entrez style taxonomy efetch requests from the taxonomy on this port, for testing the kraken2 scripts without NCBI')
+	return parser.parse_args()
+
+CACHE_NAME = "taxonomy.cache"
+# File type, byte order check and section sizes (taxID slots, name bytes, rank table bytes) at the start of a cache
+CACHE_MAGIC = b"KTAXv1\0\0"
+CACHE_HEADER = struct.Struct("=8sIIQQQ")
+BYTE_ORDER_CHECK = 0x01020304
+
+# Pads a section of the cache so the next one starts 8 byte aligned
+def padding(length):
+	return b"\0" * (-length % 8)
+
+# Reads nodes.dmp, names.dmp and merged.dmp into cache bytes: the header, rank table, then parent (int32, -1 if absent),
+# rank code (uint8) and name offset (uint32, one past the end) arrays over every taxID and the scientific names back to back
+def build_cache_bytes(taxdump):
+	parents={}
+	ranks={}
+	rank_codes={}
+	with open(os.path.join(taxdump, "nodes.dmp"), 'r') as nodes:
+		for line in nodes:
+			fields=line.split("\t|\t", 3)
+			taxID=int(fields[0])
+			parents[taxID]=int(fields[1])
+			if fields[2] not in rank_codes:
+				rank_codes[fields[2]]=len(rank_codes)
+			ranks[taxID]=rank_codes[fields[2]]
+	names={}
+	with open(os.path.join(taxdump, "names.dmp"), 'r') as names_file:
+		for line in names_file:
+			if line.endswith("\t|\tscientific name\t|\n"):
+				fields=line.split("\t|\t", 2)
+				names[int(fields[0])]=fields[1].encode()
+	# Retired taxIDs look up as the taxon they were merged into, as Entrez returns them
+	if os.path.isfile(os.path.join(taxdump, "merged.dmp")):
+		with open(os.path.join(taxdump, "merged.dmp"), 'r') as merged:
+			for line in merged:
+				fields=line.split("\t|\t", 1)
+				old_taxID=int(fields[0])
+				new_taxID=int(fields[1].split("\t")[0])
+				if new_taxID in parents and old_taxID not in parents:
+					parents[old_taxID]=parents[new_taxID]
+					ranks[old_taxID]=ranks[new_taxID]
+					if new_taxID in names:
+						names[old_taxID]=names[new_taxID]
+	size=max(parents)+1
+	parent_array=array('i', [-1]) * size
+	rank_array=array('B', [0]) * size
+	for taxID in parents:
+		parent_array[taxID]=parents[taxID]
+		rank_array[taxID]=ranks[taxID]
+	name_offsets=array('I', [0]) * (size+1)
+	name_blob=[]
+	offset=0
+	for taxID in range(size):
+		name=names.get(taxID)
+		if name is not None:
+			name_blob.append(name)
+			offset+=len(name)
+		name_offsets[taxID+1]=offset
+	name_blob=b"".join(name_blob)
+	rank_table="\n".join(sorted(rank_codes, key=rank_codes.get)).encode()
+	sections=[CACHE_HEADER.pack(CACHE_MAGIC, BYTE_ORDER_CHECK, 0, size, len(name_blob), len(rank_table))]
+	for section in [rank_table, parent_array.tobytes(), rank_array.tobytes(), name_offsets.tobytes(), name_blob]:
+		sections.append(section)
+		sections.append(padding(len(section)))
+	return b"".join(sections)
+
+# Taxonomy arrays over a cache held in memory or memory mapped from disk
+class Taxonomy:
+	def __init__(self, buffer, source=None):
+		self.buffer=buffer
+		self.source=source
+		self.view=view=memoryview(buffer)
+		magic, byte_order, reserved, size, names_length, rank_table_length=CACHE_HEADER.unpack_from(view, 0)
+		if magic != CACHE_MAGIC or byte_order != BYTE_ORDER_CHECK:
+			raise ValueError("Not a taxonomy cache for this machine: "+str(source))
+		offset=CACHE_HEADER.size
+		self.rank_names=bytes(view[offset:offset+rank_table_length]).decode().split("\n")
+		offset+=rank_table_length+len(padding(rank_table_length))
+		self.parents=view[offset:offset+4*size].cast('i')
+		offset+=4*size+len(padding(4*size))
+		self.ranks=view[offset:offset+size]
+		offset+=size+len(padding(size))
+		self.name_offsets=view[offset:offset+4*(size+1)].cast('I')
+		offset+=4*(size+1)+len(padding(4*(size+1)))
+		self.names=view[offset:offset+names_length]
+		self.size=size
+
+	def has_taxID(self, taxID):
+		return 0 <= taxID < self.size and self.parents[taxID] != -1
+
+	def getName(self, taxID):
+		return bytes(self.names[self.name_offsets[taxID]:self.name_offsets[taxID+1]]).decode()
+
+	def getRank(self, taxID):
+		return self.rank_names[self.ranks[taxID]]
+
+	def getParent(self, taxID):
+		return self.parents[taxID]
+
+	# taxIDs above taxID from the top down, without root (1) or taxID itself, the taxa Entrez lists as LineageEx
+	def ancestors(self, taxID):
+		lineage=[]
+		parent=self.parents[taxID]
+		while parent != 1 and parent != taxID and parent > 0:
+			lineage.append(parent)
+			taxID=parent
+			parent=self.parents[taxID]
+		lineage.reverse()
+		return lineage
+
+	# Builds the record Entrez.read gives for a taxonomy efetch of taxID, so callers can use local and remote lineages alike
+	def record(self, taxID):
+		entry={"TaxId": str(taxID), "ScientificName": self.getName(taxID), "Rank": self.getRank(taxID)}
+		lineage=[{"TaxId": str(ancestor), "ScientificName": self.getName(ancestor), "Rank": self.getRank(ancestor)} for ancestor in self.ancestors(taxID)]
+		if len(lineage) > 0:
+			entry["LineageEx"]=lineage
+		return entry
+
+	def close(self):
+		self.parents.release()
+		self.name_offsets.release()
+		self.ranks.release()
+		self.names.release()
+		self.view.release()
+		if isinstance(self.buffer, mmap.mmap):
+			self.buffer.close()
+
+# Memory maps a taxonomy cache file
+def open_cache(cache_file):
+	with open(cache_file, 'rb') as cache:
+		return Taxonomy(mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ), cache_file)
+
+# Loads the taxonomy from a cache file, or from a taxdump folder through the taxonomy.cache beside it. The cache is (re)built when
+# missing or older than the dump, written under a temporary name and renamed into place so jobs starting together never read half a
+# cache. If the folder can't be written to the taxonomy is built in memory for this run only
+def load_taxonomy(taxonomy_path):
+	if os.path.isfile(taxonomy_path):
+		return open_cache(taxonomy_path)
+	cache_file=os.path.join(taxonomy_path, CACHE_NAME)
+	dump_time=max(os.path.getmtime(os.path.join(taxonomy_path, dump)) for dump in ["nodes.dmp", "names.dmp"])
+	if os.path.isfile(cache_file) and os.path.getmtime(cache_file) >= dump_time:
+		return open_cache(cache_file)
+	cache_bytes=build_cache_bytes(taxonomy_path)
+	try:
+		temp_handle, temp_name=tempfile.mkstemp(prefix=".building_", dir=taxonomy_path)
+		with os.fdopen(temp_handle, 'wb') as temp_cache:
+			temp_cache.write(cache_bytes)
+		# Readable by everyone sharing the database, like the dump itself
+		os.chmod(temp_name, 0o644)
+		os.rename(temp_name, cache_file)
+	except (IOError, OSError):
+		print("Could not save taxonomy cache to", taxonomy_path, "- using it from memory")
+		return Taxonomy(cache_bytes, taxonomy_path)
+	return open_cache(cache_file)
+
+# Default place for the lineage cache, node local scratch shared by all of a user's jobs on the node. Not $TMPDIR, which the queue
+# gives each job and removes when it ends, and not the home folder, which is NFS on the cluster
+DEFAULT_LINEAGE_CACHE = os.path.join("/tmp", "kraken2_lineages_"+getpass.getuser()+".sqlite")
+
+# File systems whose locking can't be trusted to keep sqlite writers on different hosts apart
+NETWORK_FILESYSTEMS = ["nfs", "nfs4", "cifs", "smb3", "smbfs", "afs", "lustre", "gpfs", "beegfs", "panfs", "ceph", "glusterfs", "fuse.sshfs"]
+
+# Adds the lineage cache options to a kraken2 script's argument parser
+def add_cache_arguments(parser):
+	parser.add_argument('--cache', default=DEFAULT_LINEAGE_CACHE, help='sqlite file caching lineages fetched from entrez, must be on a node local disk as sqlite locking is unreliable on NFS, caching is skipped for files on network file systems (default: '+DEFAULT_LINEAGE_CACHE+')')
+	parser.add_argument('--cache_days', type=float, default=30, help='days before a cached lineage is fetched again (default: 30)')
+	parser.add_argument('--cache_size', type=int, default=200000, help='most lineages to keep in the cache, oldest are dropped first (default: 200000)')
+	parser.add_argument('--no_cache', action='store_true', help='always fetch lineages from entrez')
+
+# Type of the file system path is on, from the longest mount point in /proc/mounts holding it, None where that can't be told
+def filesystem_type(path):
+	path=os.path.realpath(path)
+	mount_point=None
+	fs_type=None
+	try:
+		with open("/proc/mounts", 'r') as mounts:
+			for line in mounts:
+				fields=line.split()
+				if len(fields) < 3:
+					continue
+				mounted=fields[1].replace("\\040", " ")
+				if path == mounted or path.startswith(mounted.rstrip("/")+"/"):
+					if mount_point is None or len(mounted) >= len(mount_point):
+						mount_point=mounted
+						fs_type=fields[2]
+	except (IOError, OSError):
+		return None
+	return fs_type
+
+# On disk cache of the taxon records entrez returned for each taxID. Any number of jobs on one node can share one: sqlite locks the file
+# for each read or write and waits for other jobs' locks to clear. Those locks aren't reliable on network file systems, so a cache on
+# one is refused rather than risk jobs on different nodes corrupting it, and a cache known to be on a local disk uses a write ahead
+# log so lookups don't wait on jobs saving records. Records older than max_days count as missing and are fetched and stored again,
+# and expired or surplus (beyond max_entries, oldest first) records are dropped each time the cache is opened. Cache problems never
+# stop a run, the lookup just goes to entrez
+class Lineage_Cache:
+	def __init__(self, cache_file, max_days=30, max_entries=200000):
+		self.cache_file=cache_file
+		self.max_age=max_days * 86400
+		cache_folder=os.path.dirname(os.path.abspath(cache_file))
+		if not os.path.isdir(cache_folder):
+			os.makedirs(cache_folder)
+		fs_type=filesystem_type(cache_folder)
+		if fs_type in NETWORK_FILESYSTEMS:
+			raise IOError("sqlite locking is unreliable on "+fs_type+", use --cache to put the lineage cache on a node local disk")
+		self.connection=sqlite3.connect(cache_file, timeout=120, isolation_level=None)
+		if fs_type is not None:
+			self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS lineages (taxID INTEGER PRIMARY KEY, records TEXT NOT NULL, fetched REAL NOT NULL)")
+		self.connection.execute("CREATE INDEX IF NOT EXISTS lineages_fetched ON lineages (fetched)")
+		self.connection.execute("DELETE FROM lineages WHERE fetched < ?", (time.time() - self.max_age,))
+		self.connection.execute("DELETE FROM lineages WHERE taxID IN (SELECT taxID FROM lineages ORDER BY fetched DESC LIMIT -1 OFFSET ?)", (max(0, max_entries),))
+
+	def get(self, taxID):
+		try:
+			row=self.connection.execute("SELECT records, fetched FROM lineages WHERE taxID = ?", (int(taxID),)).fetchone()
+		except sqlite3.Error as error:
+			print("Lineage cache unavailable:", error)
+			return None
+		if row is None or row[1] < time.time() - self.max_age:
+			return None
+		return json.loads(row[0])
+
+	def put(self, taxID, records):
+		try:
+			self.connection.execute("INSERT OR REPLACE INTO lineages (taxID, records, fetched) VALUES (?, ?, ?)", (int(taxID), json.dumps(records), time.time()))
+		except sqlite3.Error as error:
+			print("Lineage cache unavailable:", error)
+
+	def put_many(self, records_by_taxID):
+		try:
+			self.connection.execute("BEGIN IMMEDIATE")
+			try:
+				now=time.time()
+				self.connection.executemany("INSERT OR REPLACE INTO lineages (taxID, records, fetched) VALUES (?, ?, ?)", [(int(taxID), json.dumps(records_by_taxID[taxID]), now) for taxID in records_by_taxID])
+				self.connection.execute("COMMIT")
+			except sqlite3.Error:
+				self.connection.execute("ROLLBACK")
+				raise
+		except sqlite3.Error as error:
+			print("Lineage cache unavailable:", error)
+
+	def close(self):
+		self.connection.close()
+
+# Opens the lineage cache a kraken2 script's arguments ask for, None if caching is off or the cache can't be opened
+def open_lineage_cache(args):
+	if args.no_cache:
+		return None
+	try:
+		return Lineage_Cache(args.cache, args.cache_days, args.cache_size)
+	except (IOError, OSError, sqlite3.Error) as error:
+		print("Not caching lineages, could not open", args.cache, "-", error)
+		return None
+
+# NCBI E-utilities, point --entrez_url at a stub server (python3 ./kraken2_taxonomy.py -t taxdump -s port) to test without NCBI
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+
+# Adds the entrez options to a kraken2 script's argument parser
+def add_entrez_arguments(parser):
+	parser.add_argument('--entrez_url', default=os.environ.get("NCBI_EUTILS_URL", EUTILS_URL), help='E-utilities base url (default: $NCBI_EUTILS_URL or '+EUTILS_URL+')')
+	parser.add_argument('--entrez_batch', type=int, default=200, help='most taxIDs to fetch per entrez request (default: 200)')
+	parser.add_argument('--api_key', default=os.environ.get("NCBI_API_KEY"), help='NCBI API key, allows 10 instead of 3 requests a second (default: $NCBI_API_KEY)')
+
+# Hands out requests at rate per second, holding up to capacity unused ones. Waiting for a token only sleeps for whatever part of
+# the interval hasn't already passed, so time spent parsing between requests counts towards the limit
+class Token_Bucket:
+	def __init__(self, rate, capacity=1):
+		self.rate=float(rate)
+		self.capacity=float(capacity)
+		self.tokens=float(capacity)
+		self.updated=time.time()
+
+	def take(self):
+		now=time.time()
+		self.tokens=min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+		self.updated=now
+		if self.tokens < 1:
+			time.sleep((1 - self.tokens) / self.rate)
+			self.tokens=1
+			self.updated=time.time()
+		self.tokens-=1
+
+# Turns one Taxon element of an efetch TaxaSet into the record Entrez.read would give for it
+def taxon_record(taxon):
+	entry={"TaxId": taxon.findtext("TaxId"), "ScientificName": taxon.findtext("ScientificName"), "Rank": taxon.findtext("Rank")}
+	lineage=[{"TaxId": ancestor.findtext("TaxId"), "ScientificName": ancestor.findtext("ScientificName"), "Rank": ancestor.findtext("Rank")} for ancestor in taxon.findall("LineageEx/Taxon")]
+	if len(lineage) > 0:
+		entry["LineageEx"]=lineage
+	return entry
+
+# Fetches taxon records from entrez (or a stub server) in batches of up to batch_size taxIDs per request, throttled to NCBI's limit
+class Entrez_Taxonomy:
+	def __init__(self, url=EUTILS_URL, batch_size=200, api_key=None, tries=3):
+		self.url=url.rstrip("/")+"/efetch.fcgi"
+		self.batch_size=max(1, batch_size)
+		self.api_key=api_key
+		self.tries=tries
+		if api_key:
+			self.throttle=Token_Bucket(10)
+		else:
+			self.throttle=Token_Bucket(3)
+
+	def request(self, taxIDs):
+		params={"db": "taxonomy", "id": ",".join(taxIDs), "retmode": "xml", "tool": "kraken2_taxonomy", "email": getpass.getuser()}
+		if self.api_key:
+			params["api_key"]=self.api_key
+		data=urllib.parse.urlencode(params).encode()
+		for attempt in range(self.tries):
+			self.throttle.take()
+			try:
+				response=urllib.request.urlopen(self.url, data, timeout=120)
+				try:
+					return ElementTree.parse(response).getroot()
+				finally:
+					response.close()
+			except (IOError, OSError, ElementTree.ParseError) as error:
+				if attempt == self.tries - 1:
+					raise
+				print("Entrez request failed (", error, "), trying again")
+				time.sleep(2 ** attempt)
+
+	# Gets {taxID: records} for taxIDs, with an empty list for any entrez doesn't know. Retired taxIDs are matched through the AkaTaxIds
+	# of the taxon they were merged into
+	def fetch(self, taxIDs):
+		results={}
+		for start in range(0, len(taxIDs), self.batch_size):
+			batch=[str(taxID) for taxID in taxIDs[start:start+self.batch_size]]
+			wanted=set(batch)
+			for taxon in self.request(batch).findall("Taxon"):
+				record=taxon_record(taxon)
+				for taxID in [record["TaxId"]] + [aka.text for aka in taxon.findall("AkaTaxIds/TaxId")]:
+					if taxID in wanted:
+						results[taxID]=[record]
+			for taxID in batch:
+				if taxID not in results:
+					results[taxID]=[]
+		return results
+
+# The number of a kraken2 taxID column, which is "name (taxid N)" when kraken2 ran with --use-names. None if there isn't one
+def taxID_number(taxID):
+	taxID=str(taxID).strip()
+	if taxID.endswith(")") and "(taxid " in taxID:
+		taxID=taxID.rsplit("(taxid ", 1)[1][:-1]
+	if taxID.isdigit():
+		return int(taxID)
+	return None
+
+# Lists the distinct taxIDs of a kraken2 file in the order they first appear, reading up to the first blank line as the scripts do
+def kraken_taxIDs(input_kraken):
+	taxIDs=[]
+	seen=set()
+	with open(input_kraken, 'r') as kraken:
+		for line in kraken:
+			line=line.strip()
+			if line == '':
+				break
+			taxID=line.split("\t")[2]
+			if taxID not in seen:
+				seen.add(taxID)
+				taxIDs.append(taxID)
+	return taxIDs
+
+# The record of a taxID kraken2 left unclassified (0) or that no taxonomy knows, an unranked "unclassified" taxon with an empty lineage
+def unclassified_record(taxID):
+	return {"TaxId": str(taxID), "ScientificName": "unclassified", "Rank": "no rank", "LineageEx": []}
+
+# Gets {taxID: records} for many taxIDs (as they appear in the kraken2 file), each shaped like Entrez.read of a taxonomy efetch. They
+# come from the local taxonomy when one is loaded, then the lineage cache, and whatever is left is fetched from entrez in batches and
+# saved to the cache. TaxID 0 (unclassified) and taxIDs none of them know get unclassified_record. With a local taxonomy, a failed
+# entrez request for the few taxIDs it doesn't know leaves them unclassified instead of stopping the script
+def fetch_taxon_records_batch(taxIDs, taxonomy=None, cache=None, entrez=None):
+	results={}
+	missing={}
+	for taxID in taxIDs:
+		if taxID in results:
+			continue
+		number=taxID_number(taxID)
+		results[taxID]=[unclassified_record(taxID)]
+		if number is None or number == 0:
+			continue
+		if taxonomy is not None and taxonomy.has_taxID(number):
+			results[taxID]=[taxonomy.record(number)]
+			continue
+		if cache is not None:
+			records=cache.get(number)
+			if records is not None:
+				results[taxID]=records
+				continue
+		if number not in missing:
+			missing[number]=[]
+		missing[number].append(taxID)
+	if len(missing) > 0:
+		if entrez is None:
+			entrez=Entrez_Taxonomy()
+		try:
+			fetched=entrez.fetch(list(missing))
+		except (IOError, OSError, ElementTree.ParseError) as error:
+			if taxonomy is None:
+				raise
+			print("Could not fetch", len(missing), "taxIDs missing from the local taxonomy from entrez (", error, "), leaving them unclassified")
+			fetched={}
+		if cache is not None:
+			cache.put_many(dict((number, fetched[str(number)]) for number in missing if len(fetched.get(str(number), [])) > 0))
+		for number in missing:
+			if len(fetched.get(str(number), [])) > 0:
+				for taxID in missing[number]:
+					results[taxID]=fetched[str(number)]
+	return results
+
+# Gets the taxonomy records for one taxID, see fetch_taxon_records_batch
+def fetch_taxon_records(taxID, taxonomy=None, cache=None, entrez=None):
+	return fetch_taxon_records_batch([taxID], taxonomy, cache, entrez)[taxID]
+
+# Writes the efetch xml entrez would return for the records of the taxIDs asked for
+def efetch_xml(records):
+	taxa_set=ElementTree.Element("TaxaSet")
+	for record in records:
+		taxon=ElementTree.SubElement(taxa_set, "Taxon")
+		for field in ["TaxId", "ScientificName", "Rank"]:
+			ElementTree.SubElement(taxon, field).text=record[field]
+		if "LineageEx" in record:
+			lineage=ElementTree.SubElement(taxon, "LineageEx")
+			for ancestor in record["LineageEx"]:
+				ancestor_taxon=ElementTree.SubElement(lineage, "Taxon")
+				for field in ["TaxId", "ScientificName", "Rank"]:
+					ElementTree.SubElement(ancestor_taxon, field).text=ancestor[field]
+	return b'<?xml version="1.0" ?>\n' + ElementTree.tostring(taxa_set)
+
+# Serves taxonomy efetch requests (GET or POST, id=comma separated taxIDs) from the local taxonomy, a stand in for entrez when testing
+def serve_taxonomy(taxonomy, port):
+	class Efetch_Handler(http.server.BaseHTTPRequestHandler):
+		def respond(self, query):
+			params=urllib.parse.parse_qs(query)
+			taxIDs=[taxID for ids in params.get("id", []) for taxID in ids.split(",") if taxID.strip().isdigit()]
+			records=[taxonomy.record(int(taxID)) for taxID in taxIDs if taxonomy.has_taxID(int(taxID))]
+			body=efetch_xml(records)
+			self.send_response(200)
+			self.send_header("Content-Type", "text/xml")
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def do_GET(self):
+			self.respond(urllib.parse.urlsplit(self.path).query)
+
+		def do_POST(self):
+			self.respond(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+
+	server=http.server.HTTPServer(("localhost", port), Efetch_Handler)
+	print("Serving taxonomy efetch at http://localhost:"+str(server.server_port)+"/ (use as --entrez_url)")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	server.server_close()
+
+if __name__ == '__main__':
+	args = parseArgs()
+	taxonomy=load_taxonomy(args.taxonomy)
+	print("Taxonomy loaded from", taxonomy.source, "-", taxonomy.size, "taxID slots")
+	for taxID in args.taxIDs:
+		if taxonomy.has_taxID(int(taxID)):
+			print(taxID+"\t"+";".join(["root"]+[taxonomy.getName(ancestor) for ancestor in taxonomy.ancestors(int(taxID))]+[taxonomy.getName(int(taxID))]))
+		else:
+			print(taxID+"\tnot found")
+	if args.serve is not None:
+		serve_taxonomy(taxonomy, args.serve)
+	taxonomy.close()
@@ -3,11 +3,11 @@
 #
 # Description: Script to convert kraken2 file to mpa file
 #
-# Usage: python3 ./kraken2_report_from_kraken.py -i input_kraken2_file -o output_mpa_filename
+# Usage: python3 ./kraken2_report_from_kraken.py -i input_kraken2_file -o output_mpa_filename [-t taxdump_folder] [--cache lineage_cache.sqlite] [--cache_days days] [--cache_size entries] [--no_cache] [--entrez_url url] [--entrez_batch taxIDs_per_request] [--api_key NCBI_API_key]
 #
 # Output location: parameter
 #
-# Modules required: Biopython must be available in python instance
+# Modules required: None
 #
 # v1.0 (10/3/2019)
 #
@@ -17,25 +17,24 @@
 import sys
 import glob
 import fileinput
-import getpass
 import argparse
-from Bio import Entrez
-from time import sleep
+from kraken2_taxonomy import load_taxonomy, fetch_taxon_records, fetch_taxon_records_batch, kraken_taxIDs, add_cache_arguments, add_entrez_arguments, open_lineage_cache, Entrez_Taxonomy
 
 # Parse all arguments from command line
 def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to turn kraken2 file to mpa')
 	parser.add_argument('-i', '--input', required=True, help='input kraken2 filename')
 	parser.add_argument('-o', '--output', required=True, help='output mpa filename')
+	parser.add_argument('-t', '--taxonomy', help='local NCBI taxdump folder (nodes.dmp, names.dmp) or taxonomy cache to look taxIDs up in, entrez is only asked for taxIDs it does not have')
+	add_cache_arguments(parser)
+	add_entrez_arguments(parser)
 	return parser.parse_args()
 
 # Script that will retrieve the taxonomic lineage of a sample from entrez
-def get_Taxon_Tree_From_NCBI(taxID):
-	Entrez.email = getpass.getuser()
-	#Creates the data structure from a pull from entrez nucleotide database using accession id with return type of genbank text mode
-	handle = Entrez.efetch(db="taxonomy", id=taxID, mode="text", rettype="xml")
-	#Parses the returned output into lines
-	result= Entrez.read(handle)
+def get_Taxon_Tree_From_NCBI(taxID, result=None):
+	#Gets the taxon records from the local taxonomy if one was given, the lineage cache or entrez otherwise, unless already fetched
+	if result is None:
+		result=fetch_taxon_records(taxID, taxonomy, cache, entrez)
 	#Goes through each line until it finds (and prints) the organism name that the accession number represents
 	for taxon in result:
 		taxid = taxon["TaxId"]
@@ -50,6 +49,8 @@ def get_Taxon_Tree_From_NCBI(taxID):
 
 # Translate kraken output to a slightly more readable label format.
 def translate(input_kraken, output_labels):
+	# Looks every distinct taxID up before going through the contigs, so entrez gets a few batched requests instead of one per taxID
+	taxon_records=fetch_taxon_records_batch(kraken_taxIDs(input_kraken), taxonomy, cache, entrez)
 	kraken=open(input_kraken,'r')
 	line=kraken.readline().strip()
 	tax_tree_dict={}
@@ -61,7 +62,7 @@ def translate(input_kraken, output_labels):
 		contig_id = line_sections[1]
 		contig_taxID = line_sections[2]
 		if contig_taxID not in tax_tree_dict.keys():
-			tax_tree_dict[contig_taxID]=get_Taxon_Tree_From_NCBI(contig_taxID)
+			tax_tree_dict[contig_taxID]=get_Taxon_Tree_From_NCBI(contig_taxID, taxon_records[contig_taxID])
 		print(str(counter)+":"+contig_id+"	"+tax_tree_dict[contig_taxID])
 		label_lines.append(contig_id+"	"+tax_tree_dict[contig_taxID])
 		line=kraken.readline().strip()
@@ -76,12 +77,10 @@ def translate(input_kraken, output_labels):
 #translate(sys.argv[1], sys.argv[2])
 
 # Script that will retrieve taxonomic info from entrez and convert it into mpa format
-def get_mpa_string_From_NCBI(taxID):
-	Entrez.email = getpass.getuser()
-	#Creates the data structure from a pull from entrez nucleotide database using accession id with return type of genbank text mode
-	handle = Entrez.efetch(db="taxonomy", id=taxID, mode="text", rettype="xml")
-	#Parses the returned output into lines
-	result= Entrez.read(handle)
+def get_mpa_string_From_NCBI(taxID, result=None):
+	#Gets the taxon records from the local taxonomy if one was given, the lineage cache or entrez otherwise, unless already fetched
+	if result is None:
+		result=fetch_taxon_records(taxID, taxonomy, cache, entrez)
 	#Will have to change this region to be able to handle more descriptive lists downstream
 	recognized_ranks={"superkingdom":"d", "kingdom":"k", "phylum":"p", "class":"c", "order":"o", "family":"f", "genus":"g", "species":"s", "species_group":"x"}
 	for entry in result:
@@ -117,6 +116,8 @@ def get_mpa_string_From_NCBI(taxID):
 
 # Sorts mpas to put similar entries together, easier for humans to look at
 def organize_mpas(input_kraken, output_mpa):
+	# Looks every distinct taxID up before going through the contigs, so entrez gets a few batched requests instead of one per taxID
+	taxon_records=fetch_taxon_records_batch(kraken_taxIDs(input_kraken), taxonomy, cache, entrez)
 	kraken=open(input_kraken,'r')
 	line=kraken.readline().strip()
 	mpa_dict={}
@@ -128,7 +129,7 @@ def organize_mpas(input_kraken, output_mpa):
 		contig_taxID = line_sections[2]
 		if contig_taxID not in mpa_dict.keys():
 			print("Adding", contig_taxID)
-			mpa_dict[contig_taxID]=get_mpa_string_From_NCBI(contig_taxID)
+			mpa_dict[contig_taxID]=get_mpa_string_From_NCBI(contig_taxID, taxon_records[contig_taxID])
 			mpa_counts[contig_taxID]=1
 		else:
 			if contig_taxID not in mpa_counts.keys():
@@ -138,7 +139,6 @@ def organize_mpas(input_kraken, output_mpa):
 				#print("Incrementing:", contig_taxID)
 				mpa_counts[contig_taxID]+=1
 		line=kraken.readline().strip()
-		sleep(0.005)
 	kraken.close()
 	mpa_taxon_counts={}
 	#print("mpa_dict length:", len(mpa_dict))
@@ -177,4 +177,12 @@ def organize_mpas(input_kraken, output_mpa):
 #get_mpa_string_From_NCBI(470, blank_dick)
 
 args = parseArgs()
+# Looks taxIDs up in the local taxonomy when one is given (entrez for any it lacks), the lineage cache then entrez otherwise
+taxonomy=None
+cache=None
+entrez=Entrez_Taxonomy(args.entrez_url, args.entrez_batch, args.api_key)
+if args.taxonomy is not None:
+	taxonomy=load_taxonomy(args.taxonomy)
+else:
+	cache=open_lineage_cache(args)
 organize_mpas(args.input, args.output)
@@ -3,11 +3,11 @@
 #
 # Description: Script to convert kraken2 file to label file
 #
-# Usage: python3 ./kraken2_translate.py -i input_kraken2_file -o output_label_filename
+# Usage: python3 ./kraken2_translate.py -i input_kraken2_file -o output_label_filename [-t taxdump_folder] [--cache lineage_cache.sqlite] [--cache_days days] [--cache_size entries] [--no_cache] [--entrez_url url] [--entrez_batch taxIDs_per_request] [--api_key NCBI_API_key]
 #
 # Output location: parameter
 #
-# Modules required: Biopython must be available in python instance
+# Modules required: None
 #
 # v1.0 (10/3/2019)
 #
@@ -17,25 +17,24 @@
 import sys
 import glob
 import fileinput
-import getpass
 import argparse
-from Bio import Entrez
-from time import sleep
+from kraken2_taxonomy import load_taxonomy, fetch_taxon_records, fetch_taxon_records_batch, kraken_taxIDs, add_cache_arguments, add_entrez_arguments, open_lineage_cache, Entrez_Taxonomy
 
 # Parse all argument from command line
 def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to translate kraken2 file to label file')
 	parser.add_argument('-i', '--input', required=True, help='input kraken2 filename')
 	parser.add_argument('-o', '--output', required=True, help='output label filename')
+	parser.add_argument('-t', '--taxonomy', help='local NCBI taxdump folder (nodes.dmp, names.dmp) or taxonomy cache to look taxIDs up in, entrez is only asked for taxIDs it does not have')
+	add_cache_arguments(parser)
+	add_entrez_arguments(parser)
 	return parser.parse_args()
 
 # Script that will trim fasta files of any sequences that are smaller than the threshold
-def get_Taxon_Tree_From_NCBI(taxID):
-	Entrez.email = getpass.getuser()
-	#Creates the data structure from a pull from entrez nucleotide database using accession id with return type of genbank text mode
-	handle = Entrez.efetch(db="taxonomy", id=taxID, mode="text", rettype="xml")
-	#Parses the returned output into lines
-	result= Entrez.read(handle)
+def get_Taxon_Tree_From_NCBI(taxID, result=None):
+	#Gets the taxon records from the local taxonomy if one was given, the lineage cache or entrez otherwise, unless already fetched
+	if result is None:
+		result=fetch_taxon_records(taxID, taxonomy, cache, entrez)
 	#Goes through each line until it finds (and prints) the organism name that the accession number represents
 	for taxon in result:
 		taxid = taxon["TaxId"]
@@ -53,6 +52,8 @@ def get_Taxon_Tree_From_NCBI(taxID):
 
 # Translate kraken output to a slightly more readable label format.
 def translate(input_kraken, output_labels):
+	# Looks every distinct taxID up before going through the contigs, so entrez gets a few batched requests instead of one per taxID
+	taxon_records=fetch_taxon_records_batch(kraken_taxIDs(input_kraken), taxonomy, cache, entrez)
 	kraken_file=open(input_kraken,'r')
 	line=kraken_file.readline().strip()
 	tax_tree_dict={}
@@ -64,12 +65,11 @@ def translate(input_kraken, output_labels):
 		contig_id = line_sections[1]
 		contig_taxID = line_sections[2]
 		if contig_taxID not in tax_tree_dict.keys():
-			tax_tree_dict[contig_taxID]=get_Taxon_Tree_From_NCBI(contig_taxID)
+			tax_tree_dict[contig_taxID]=get_Taxon_Tree_From_NCBI(contig_taxID, taxon_records[contig_taxID])
 		print(str(counter)+":"+contig_id+"	"+tax_tree_dict[contig_taxID])
 		label_lines.append(contig_id+"	"+tax_tree_dict[contig_taxID])
 		line=kraken_file.readline().strip()
 		counter+=1
-		sleep(0.005)
 	kraken_file.close()
 	label_file=open(output_labels, 'w')
 	label_file.write("\n".join(label_lines))
@@ -78,5 +78,13 @@ def translate(input_kraken, output_labels):
 		print(line)
 
 args = parseArgs()
+# Looks taxIDs up in the local taxonomy when one is given (entrez for any it lacks), the lineage cache then entrez otherwise
+taxonomy=None
+cache=None
+entrez=Entrez_Taxonomy(args.entrez_url, args.entrez_batch, args.api_key)
+if args.taxonomy is not None:
+	taxonomy=load_taxonomy(args.taxonomy)
+else:
+	cache=open_lineage_cache(args)
 # Start program
 translate(args.input, args.output)
@@ -124,22 +124,16 @@ if [[ -d "${OUTDATADIR}/${sample_name}/FASTQs" ]]; then
 			if [[ -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq" ]] && [[ ! -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" ]]; then
 				gzip < "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq" > "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz"
 			fi
-		# Checks if they are zipped fastqs (checks for R1 first)
+		# Checks if they are zipped fastqs (checks for R1 first). They are left zipped, as the QC counter and BBDUK both read gzip directly
 		elif [[ -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R1_001.fastq.gz" ]]; then
-			#echo "R1 zipped exists - unzipping"
-			gunzip -c "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R1_001.fastq.gz" > "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R1_001.fastq"
+			echo "----- Zipped FASTQ(s) exist, continuing analysis -----"
 			# Checks for paired R2 file
-			if [[ -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" ]]; then
-				#echo "R2 zipped exists - unzipping"
-				gunzip -c "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" > "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq"
-			else
-				echo "No matching R2 to unzip :("
+			if [[ ! -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" ]]; then
+				echo "No matching R2 to R1 zipped fastq :("
 			fi
 		# Checks to see if there is an abandoned R2 zipped fastq
 		elif [[ -f "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" ]]; then
-			#echo "R2 zipped  exists - unzipping"
-			gunzip -c "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq.gz" > "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq"
-			echo "No matching R1 to unzip :("
+			echo "No matching R1 to R2 zipped fastq :("
 		fi
 	# If the folder is empty then return from function
 	else
@@ -163,7 +157,16 @@ if [ ! -d "${OUTDATADIR}/${sample_name}/preQCcounts" ]; then
 fi
 # Run qc count check on raw reads
 echo -e "Q20_Total_[bp]	Q30_Total_[bp]	Q20_R1_[bp]	Q20_R2_[bp]	Q20_R1_[%]	Q20_R2_[%]	Q30_R1_[bp]	Q30_R2_[bp]	Q30_R1_[%]	Q30_R2_[%]	Total_Sequenced_[bp]	Total_Sequenced_[reads]" > "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_counts.txt"
-python3 "${shareScript}/Fastq_Quality_Printer.py" -1 "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R1_001.fastq" -2 "${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq" >> "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_counts.txt"
+# Prefers unzipped fastqs if they exist, otherwise the counter streams the zipped ones
+raw_R1="${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R1_001.fastq"
+raw_R2="${OUTDATADIR}/${sample_name}/FASTQs/${sample_name}_R2_001.fastq"
+if [[ ! -f "${raw_R1}" ]]; then
+	raw_R1="${raw_R1}.gz"
+fi
+if [[ ! -f "${raw_R2}" ]]; then
+	raw_R2="${raw_R2}.gz"
+fi
+python3 "${shareScript}/Fastq_Quality_Printer.py" -1 "${raw_R1}" -2 "${raw_R2}" -t "${procs}" -j "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_counts_histograms.json" >> "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_counts.txt"
 
 	# Get end time of qc count and calculate run time and append to time summary (and sum to total time used)
 end=$SECONDS
@@ -228,7 +231,7 @@ if [ ! -d "${OUTDATADIR}/${sample_name}/preQCcounts" ]; then
 fi
 # Run qc count check on filtered reads
 echo -e "Q20_Total_[bp]	Q30_Total_[bp]	Q20_R1_[bp]	Q20_R2_[bp]	Q20_R1_[%]	Q20_R2_[%]	Q30_R1_[bp]	Q30_R2_[bp]	Q30_R1_[%]	Q30_R2_[%]	Total_Sequenced_[bp]	Total_Sequenced_[reads]" > "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_trimmed_counts.txt"
-python3 "${shareScript}/Fastq_Quality_Printer.py" -1 "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R1_001.paired.fq" -2 "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R2_001.paired.fq" >> "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_trimmed_counts.txt"
+python3 "${shareScript}/Fastq_Quality_Printer.py" -1 "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R1_001.paired.fq" -2 "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R2_001.paired.fq" -t "${procs}" -j "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_trimmed_counts_histograms.json" >> "${OUTDATADIR}/${sample_name}/preQCcounts/${sample_name}_trimmed_counts.txt"
 
 # Merge both unpaired fq files into one for GOTTCHA
 cat "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R1_001.unpaired.fq" "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}_R2_001.unpaired.fq" > "${OUTDATADIR}/${sample_name}/trimmed/${sample_name}.single.fq"
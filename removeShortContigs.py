@@ -3,7 +3,8 @@
 #
 # Description: Script to remove all contigs in an assembly file that are smaller than a given size. Will assume sample is located in default location
 #
-# Usage: python3 ./removeShortContigs.py -i input_assembly_file -t threshold_to_trim_all_contigs_smaller_than -s
+# Usage: python3 ./removeShortContigs.py -i input_assembly_file -t threshold_to_trim_all_contigs_smaller_than -s normal_SPAdes|plasFlow [-f] [-j]
+#	Batch: python3 ./removeShortContigs.py -l list_of_sample_folders_or_assemblies -t threshold -s normal_SPAdes|plasFlow [-p procs] [-o summary_table] [-f] [-j]
 #
 # Output location: -s SPAdes default_config.sh_output_location/run_ID/sample_name/sample_name/SPAdes/sample_name_scaffolds_trimmed.fasta or
 #	-s SPAdes default_config.sh_output_location/run_ID/sample_name/sample_name/Unicycler_assemblies/sample_name_uni_assembly/sample_name_plasmid_assembly_trimmed.fasta
@@ -17,59 +18,182 @@
 
 import sys
 import glob
+import os
 import fileinput
 import argparse
+import json
+import multiprocessing
 
 # Parse all arguments from command line
 def parseArgs(args=None):
 	parser = argparse.ArgumentParser(description='Script to trim contigs')
-	parser.add_argument('-i', '--input', required=True, help='input assembly filename')
+	inputs = parser.add_mutually_exclusive_group(required=True)
+	inputs.add_argument('-i', '--input', help='input assembly filename')
+	inputs.add_argument('-l', '--list', help='batch mode, file listing sample folders (trims Assembly/scaffolds.fasta and Assembly/contigs.fasta) or assembly files, one per line')
 	parser.add_argument('-t', '--threshold', required=True, help='threshold size to trim below')
-	parser.add_argument('-s', '--source', required=True, help='Source filetype (normal_SPAdes or plasFlow)')
+	parser.add_argument('-s', '--source', required=True, choices=['normal_SPAdes', 'plasFlow'], help='Source filetype (normal_SPAdes or plasFlow)')
+	parser.add_argument('-f', '--index', action='store_true', help='also write a samtools faidx style index of the trimmed assembly')
+	parser.add_argument('-p', '--procs', type=int, default=1, help='number of assemblies to trim at once in batch mode (default: 1)')
+	parser.add_argument('-o', '--output', help='file to write the batch mode summary table to (default: standard out)')
+	parser.add_argument('-j', '--stats', action='store_true', help='also write N50/L50, GC, N and contig length histogram of the trimmed assembly as json')
 	return parser.parse_args()
 
-# Script that will trim fasta files of any sequences that are smaller than the threshold
+# Number of bytes of lines read per block while trimming
+BLOCK_SIZE = 16 * 1024 * 1024
+# Lower edges of the contig length histogram bins written to the stats file
+LENGTH_BINS = [0, 500, 1000, 5000, 10000, 25000, 50000, 100000, 500000]
 
-def trim_assembly(input_assembly, trim_threshold, input_type):
-	assembly=open(input_assembly,'r')
+# Pulls the contig size out of a SPAdes or plasFlow formatted header
+def header_size(header, input_type):
+	line_sections=header.split(b"_")
+	if input_type == "normal_SPAdes":
+		return int(line_sections[-3].split(b'|')[0])
+	elif input_type == "plasFlow":
+		return int(line_sections[-3])
+	else:
+		raise ValueError("Unknown input type: "+str(input_type))
+
+# Summarizes the kept contig lengths, GC and N counts into the stats written beside the trimmed assembly
+def assembly_stats(contig_lengths, gc_count, n_count):
+	total_length=sum(contig_lengths)
+	n50=0
+	l50=0
+	running_length=0
+	for length in sorted(contig_lengths, reverse=True):
+		running_length=running_length+length
+		l50+=1
+		if running_length * 2 >= total_length:
+			n50=length
+			break
+	histogram=[]
+	for i in range(len(LENGTH_BINS)):
+		upper=None
+		if i + 1 < len(LENGTH_BINS):
+			upper=LENGTH_BINS[i+1]
+		in_bin=[length for length in contig_lengths if length >= LENGTH_BINS[i] and (upper is None or length < upper)]
+		histogram.append({"min": LENGTH_BINS[i], "max": upper, "contigs": len(in_bin), "bps": sum(in_bin)})
+	gc_percent=None
+	if total_length - n_count > 0:
+		gc_percent=round(100.0 * gc_count / (total_length - n_count), 2)
+	return {"contigs": len(contig_lengths), "total_length": total_length, "largest_contig": max(contig_lengths, default=0), "N50": n50, "L50": l50, "GC_percent": gc_percent, "N_count": n_count, "length_histogram": histogram}
+
+# Script that will trim fasta files of any sequences that are smaller than the threshold. Lines of kept contigs are copied
+# to the output as they are read, and the .fai style index (name, length, offset, linebases, linewidth) and assembly stats are built alongside if requested
+
+def trim_assembly(input_assembly, trim_threshold, input_type, make_index=False, make_stats=False, quiet=False):
+	trim_threshold=int(trim_threshold)
+	assembly=open(input_assembly,'rb')
 	trimmed_assembly=input_assembly+".TRIMMED.fasta"
-	trimmed_output=open(trimmed_assembly, 'w')
-	line=assembly.readline().strip()
+	trimmed_output=open(trimmed_assembly, 'wb')
+	index_entries=[]
+	entry=None
+	keep=False
+	output_position=0
 	total_size=0
 	total_no_size=0
 	total_cuts=0
-	while line != '':
-		if line [0] == ">":
-			line_sections=line.split("_")
-			sequence=""
-			#print (line_sections[3], "vs", trim_threshold)
-			if input_type == "normal_SPAdes":
-				contig_size = line_sections[-3].split('|')[0]
-			elif input_type == "plasFlow":
-				contig_size = line_sections[-3]
-			else:
-				print("Unknown input type:", input_type)
-			if int(contig_size) > int(trim_threshold):
-				header=line
-				line=assembly.readline().strip()
-				while line != '' and line[0] != ">":
-					sequence=sequence+'\n'+line
-					line=assembly.readline().strip()
-				#print(len(sequence),"+",total_size,"=", total_size + len(sequence))
-				total_size = total_size + len(sequence)
-				#print ("Yes",header)
-				trimmed_output.write(header)
-				trimmed_output.write(sequence+'\n')
+	gc_count=0
+	n_count=0
+	lines=assembly.readlines(BLOCK_SIZE)
+	while lines:
+		kept_lines=[]
+		for line in lines:
+			if not line.endswith(b'\n') or line.endswith(b'\r\n') or line[-2:-1].isspace():
+				line=line.strip()+b'\n'
+			if line == b'\n':
+				continue
+			if line[0:1] == b">":
+				contig_size=header_size(line.strip(), input_type)
+				keep=contig_size > trim_threshold
+				if keep:
+					entry=[line[1:].split()[0].decode(), 0, output_position + len(line), 0, 0]
+					index_entries.append(entry)
+				else:
+					total_cuts+=1
+					total_no_size=total_no_size+contig_size
+					continue
+			elif not keep:
+				continue
 			else:
-				#print ("Nope",line)
-				total_cuts+=1
-				total_no_size=total_no_size+int(contig_size)
-				line=assembly.readline().strip()
+				# Sizes include one newline per sequence line, as they always have
+				total_size=total_size+len(line)
+				entry[1]=entry[1]+len(line)-1
+				if entry[3] == 0:
+					entry[3]=len(line)-1
+					entry[4]=len(line)
+				gc_count=gc_count+line.count(b'G')+line.count(b'C')+line.count(b'g')+line.count(b'c')
+				n_count=n_count+line.count(b'N')+line.count(b'n')
+			kept_lines.append(line)
+			output_position=output_position+len(line)
+		trimmed_output.writelines(kept_lines)
+		lines=assembly.readlines(BLOCK_SIZE)
+	trimmed_output.close()
+	assembly.close()
+	if make_index:
+		index_output=open(trimmed_assembly+".fai", 'w')
+		for entry in index_entries:
+			index_output.write("\t".join(str(field) for field in entry)+"\n")
+		index_output.close()
+	stats=assembly_stats([entry[1] for entry in index_entries], gc_count, n_count)
+	if make_stats:
+		stats_output=open(trimmed_assembly+".stats.json", 'w')
+		json.dump(stats, stats_output, indent=1)
+		stats_output.write("\n")
+		stats_output.close()
+	if not quiet:
+		print("size:", total_size, "cut:", total_cuts,"contigs", total_no_size, "bps")
+	stats["size"]=total_size
+	stats["cut_contigs"]=total_cuts
+	stats["cut_bps"]=total_no_size
+	return stats
+
+# Expands a batch list into assembly files, sample folders become their SPAdes scaffolds and contigs files
+def list_assemblies(list_file):
+	assemblies=[]
+	for line in open(list_file, 'r'):
+		entry=line.strip()
+		if entry == "":
+			continue
+		if os.path.isdir(entry):
+			for assembly_name in ["scaffolds.fasta", "contigs.fasta"]:
+				if os.path.isfile(os.path.join(entry, "Assembly", assembly_name)):
+					assemblies.append(os.path.join(entry, "Assembly", assembly_name))
+		else:
+			assemblies.append(entry)
+	return assemblies
+
+# Pool worker for batch mode, failures are reported in the summary rather than stopping the batch
+def trim_worker(job):
+	input_assembly, trim_threshold, input_type, make_index, make_stats=job
+	try:
+		return input_assembly, trim_assembly(input_assembly, trim_threshold, input_type, make_index, make_stats, quiet=True), None
+	except (IOError, OSError, ValueError, IndexError) as error:
+		return input_assembly, None, str(error)
+
+# Trims every assembly in the list with a pool of procs workers and writes one summary row per assembly
+def trim_batch(list_file, trim_threshold, input_type, make_index=False, make_stats=False, procs=1, output_file=None):
+	jobs=[(assembly, trim_threshold, input_type, make_index, make_stats) for assembly in list_assemblies(list_file)]
+	pool=multiprocessing.Pool(max(1, procs))
+	results=pool.map(trim_worker, jobs, chunksize=1)
+	pool.close()
+	pool.join()
+	columns=["contigs", "total_length", "size", "cut_contigs", "cut_bps", "largest_contig", "N50", "L50", "GC_percent", "N_count"]
+	summary=["\t".join(["assembly"] + columns + ["status"])]
+	for input_assembly, stats, error in results:
+		if stats is None:
+			summary.append("\t".join([input_assembly] + ["NA"] * len(columns) + ["failed: " + error]))
 		else:
-			line=assembly.readline().strip()
-	trimmed_output.close
-	assembly.close
-	print("size:", total_size, "cut:", total_cuts,"contigs", total_no_size, "bps")
+			summary.append("\t".join([input_assembly] + [str(stats[column]) for column in columns] + ["trimmed"]))
+	if output_file is None:
+		print("\n".join(summary))
+	else:
+		summary_output=open(output_file, 'w')
+		summary_output.write("\n".join(summary) + "\n")
+		summary_output.close()
 
-args = parseArgs()
-trim_assembly(args.input, args.threshold, args.source)
+if __name__ == '__main__':
+	args = parseArgs()
+	if args.list is not None:
+		trim_batch(args.list, args.threshold, args.source, args.index, args.stats, args.procs, args.output)
+	else:
+		trim_assembly(args.input, args.threshold, args.source, args.index, args.stats)
@@ -133,7 +133,7 @@ echo "Running GAMA Antibiotic Resistance Gene Identifier"
 echo "-i ${assembly_source}"
 echo "-d ${database_path}"
 echo "-o ${OUTDATADIR}/${sample_name}.${database_and_version}.GAMA"
-python3 GAMA_ResGANNCBI_SciComp_Exe.py -i "${assembly_source}" -d "${database_path}" -o "${OUTDATADIR}/${sample_name}.${database_and_version}.GAMA"
+python3 GAMA_ResGANNCBI_SciComp_Exe.py -i "${assembly_source}" -d "${database_path}" -o "${OUTDATADIR}/${sample_name}.${database_and_version}.GAMA" -s
 
 ml -blat -Python3/3.5.4
 
@@ -161,6 +161,12 @@ if [ ! -d "$OUTDATADIR" ]; then  #create outdir if absent
 	mkdir -p "$OUTDATADIR"
 fi
 
+# Reuse genome blast databases between runs if the config sets a cache folder
+cache_options=()
+if [[ -n "${csstar_blastdb_cache}" ]]; then
+	cache_options=(-c "${csstar_blastdb_cache}" -m "${csstar_blastdb_cache_mb:-20000}")
+fi
+
 # Set and call proper version of script based upon if gaps are allowed or not
 # Calls the ungapped version of csstar
 if [ "${gapping}" == "u" ]; then
@@ -172,8 +178,8 @@ if [ "${gapping}" == "u" ]; then
 	owd=$(pwd)
 	cd "${OUTDATADIR}/${database_and_version}_${suffix}"
 	echo "Running c-SSTAR on ResGANNCBI DB using"
-	echo "python \"${shareScript}/c-SSTAR_ungapped.py\" -g \"${source_assembly}\" -s \"${sim}\" -d \"${database_path}\" > \"${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar\""
-	python3 "${shareScript}/c-SSTAR_ungapped.py" -g "${source_assembly}" -s "${sim}" -d "${database_path}" > "${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar"
+	echo "python \"${shareScript}/c-SSTAR_ungapped.py\" -g \"${source_assembly}\" -s \"${sim}\" -d \"${database_path}\" -p ${cache_options[*]} > \"${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar\""
+	python3 "${shareScript}/c-SSTAR_ungapped.py" -g "${source_assembly}" -s "${sim}" -d "${database_path}" -p "${cache_options[@]}" > "${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar"
 # Calls the gapped version of csstar
 elif [ "${gapping}" == "g" ]; then
 	suffix="gapped"
@@ -184,8 +190,8 @@ elif [ "${gapping}" == "g" ]; then
 	owd=$(pwd)
 	cd "${OUTDATADIR}/${database_and_version}_${suffix}"
 	echo "Running c-SSTAR on ResGANNCBI DB"
-	echo "python \"${shareScript}/c-SSTAR_gapped.py\" -g \"${source_assembly}\" -s \"${sim}\" -d \"${database_path}\" > \"${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar\""
-	python3 "${shareScript}/c-SSTAR_gapped.py" -g "${source_assembly}" -s "${sim}" -d "${database_path}" > "${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar"
+	echo "python \"${shareScript}/c-SSTAR_gapped.py\" -g \"${source_assembly}\" -s \"${sim}\" -d \"${database_path}\" -p ${cache_options[*]} > \"${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar\""
+	python3 "${shareScript}/c-SSTAR_gapped.py" -g "${source_assembly}" -s "${sim}" -d "${database_path}" -p "${cache_options[@]}" > "${OUTDATADIR}/${database_and_version}_${suffix}/${sample_name}.${database_and_version}.${suffix}_${sim}.sstar"
 # Unknown gapping parameter when called (not 'g' or 'u')
 else
 	echo "Unknown run type set (only use 'g' or 'u' for gapped/ungapped analysis"
@@ -99,12 +99,21 @@ elif [ "${3}" = "assembled" ]; then
 	python ${shareScript}/Kraken_Assembly_Converter_2_Exe.py -i "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}.kraken2"
 	mv "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}._BP.kraken" "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2"
 	echo "2"
-	python3 ${shareScript}/kraken2_translate.py -i "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" -o "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.labels"
+	# Look taxIDs up in the local NCBI taxonomy when it is available, entrez otherwise
+	taxonomy_option=""
+	if [[ -d "${ncbi_taxonomy}" ]]; then
+		taxonomy_option="-t ${ncbi_taxonomy}"
+	fi
+	# Entrez lineages are cached on the node local disk set in config.sh
+	if [[ -n "${kraken2_lineage_cache}" ]]; then
+		taxonomy_option="${taxonomy_option} --cache ${kraken2_lineage_cache}"
+	fi
+	python3 ${shareScript}/kraken2_translate.py -i "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" -o "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.labels" ${taxonomy_option}
 	#kraken-translate --db "${kraken_mini_db}" "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" > "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.labels"
 
 	# Create an mpa report
 	echo "3"
-	python3 ${shareScript}/kraken2_to_mpa.py -i "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" -o "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_weighted.mpa"
+	python3 ${shareScript}/kraken2_to_mpa.py -i "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" -o "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_weighted.mpa" ${taxonomy_option}
 	#kraken-mpa-report --db "${kraken_mini_db}" "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_BP.kraken2" > "${OUTDATADIR}/kraken2/${2}Assembly/${1}_${3}_weighted.mpa"
 
 	# Convert mpa to krona file# Convert mpa to krona file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+#
+# Description: Checks c-SSTAR batch mode against fake blastn and makeblastdb tools, so it runs without BLAST installed
+#
+# Usage is python3 -m pytest tests
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import os
+import random
+import stat
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reports every AR gene in FAKE_AR_FASTA as a full length hit on the first contig of each genome, laid end to end, but only as
+# many per contig as -max_target_seqs allows (500 when it isn't given) the way blastn limits subjects per query
+FAKE_BLASTN = '''#!{python}
+import os, sys
+args = sys.argv[1:]
+if '-version' in args:
+	print('blastn: 2.9.0+')
+	sys.exit(0)
+option = dict(zip(args, args[1:]))
+maxTargets = int(option.get('-max_target_seqs', 500))
+genes = []
+with open(os.environ['FAKE_AR_FASTA']) as infile:
+	for l in infile:
+		if l.startswith('>'):
+			genes.append([l[1:].split()[0], ''])
+		else:
+			genes[-1][1] += l.strip()
+contigs = []
+with open(option['-query']) as infile:
+	for l in infile:
+		if l.startswith('>'):
+			contigs.append([l[1:].split()[0], ''])
+		else:
+			contigs[-1][1] += l.strip()
+out = sys.stdout if option['-out'] == '-' else open(option['-out'], 'w')
+for contig, seq in contigs:
+	start = 0
+	for gene, geneSeq in genes[:maxTargets]:
+		if seq[start:start + len(geneSeq)] != geneSeq:
+			break
+		out.write('\\t'.join([contig, gene, '100.000', str(len(geneSeq)), '0', '0', str(start + 1), str(start + len(geneSeq)), '1', str(len(geneSeq)), '1e-50', '500.0', str(len(seq)), str(len(geneSeq)), geneSeq]) + '\\n')
+		start += len(geneSeq)
+'''
+
+FAKE_MAKEBLASTDB = '''#!{python}
+import sys
+out = sys.argv[sys.argv.index('-out') + 1]
+for ext in ['.nin', '.nsq', '.nhr']:
+	open(out + ext, 'w').close()
+'''
+
+def writeTool(folder, name, text):
+	path = os.path.join(folder, name)
+	with open(path, 'w') as outfile:
+		outfile.write(text.format(python=sys.executable))
+	os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+def test_batch_reports_genes_beyond_blastn_default_target_limit(tmp_path):
+	'''a contig carrying more AR genes than blastn's default 500 subjects per query still reports every one of them'''
+	random.seed(1)
+	numGenes = 600
+	genes = []
+	for n in range(1, numGenes + 1):
+		# ATG + sense codons, no stops so none are tagged as truncated
+		genes.append(('{0}__gene{0}__gene{0}_1__{0}__Res{0}__ResGANNCBI'.format(n), 'ATG' + ''.join(random.choice(['GCT', 'GAA', 'AAA', 'CTG']) for c in range(99))))
+	database = tmp_path / 'ar.fasta'
+	database.write_text(''.join('>{}\n{}\n'.format(gene, seq) for gene, seq in genes))
+	genome = tmp_path / 'genome.fasta'
+	genome.write_text('>NODE_1_length_180000_cov_20.0\n' + ''.join(seq for gene, seq in genes) + '\n')
+	genomes = tmp_path / 'genomes.txt'
+	genomes.write_text('{}\tS1\n'.format(genome))
+	tools = tmp_path / 'bin'
+	tools.mkdir()
+	writeTool(str(tools), 'blastn', FAKE_BLASTN)
+	writeTool(str(tools), 'makeblastdb', FAKE_MAKEBLASTDB)
+	env = dict(os.environ, PATH=str(tools) + os.pathsep + os.environ['PATH'], FAKE_AR_FASTA=str(database))
+	outdir = tmp_path / 'out'
+	subprocess.check_call([sys.executable, os.path.join(REPO, 'c-SSTAR_gapped.py'), '-d', str(database), '-l', str(genomes), '-o', str(outdir), '-s', '98'], env=env, cwd=REPO)
+	reported = [l.split('\t') for l in (outdir / 'S1.sstar').read_text().splitlines()]
+	assert len(reported) == numGenes
+	assert set(fields[2] for fields in reported) == set(gene.split('__')[1] for gene, seq in genes)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+#
+# Description: Checks that c-SSTAR -S reports each identity as its own blastn search would, using fake blastn and makeblastdb tools
+#
+# Usage is python3 -m pytest tests
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import os
+import stat
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reports the rows in FAKE_ROWS that pass -perc_identity, keeping each query's -max_target_seqs best scoring subjects
+FAKE_BLASTN = '''#!{python}
+import os, sys
+args = sys.argv[1:]
+if '-version' in args:
+	print('blastn: 2.9.0+')
+	sys.exit(0)
+option = dict(zip(args, args[1:]))
+with open(os.environ['FAKE_ROWS']) as infile:
+	rows = [l.rstrip('\\n').split('\\t') for l in infile if float(l.split('\\t')[2]) >= float(option['-perc_identity'])]
+subjects = {{}}
+for f in sorted(rows, key=lambda f: -float(f[11])):
+	subjects.setdefault(f[0], [])
+	if f[1] not in subjects[f[0]]:
+		subjects[f[0]].append(f[1])
+out = sys.stdout if option['-out'] == '-' else open(option['-out'], 'w')
+for f in rows:
+	if f[1] in subjects[f[0]][:int(option['-max_target_seqs'])]:
+		out.write('\\t'.join(f) + '\\n')
+'''
+
+FAKE_MAKEBLASTDB = '''#!{python}
+import sys
+out = sys.argv[sys.argv.index('-out') + 1]
+for ext in ['.nin', '.nsq', '.nhr']:
+	open(out + ext, 'w').close()
+'''
+
+def writeTool(folder, name, text):
+	path = os.path.join(folder, name)
+	with open(path, 'w') as outfile:
+		outfile.write(text.format(python=sys.executable))
+	os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+def test_similarities_report_hits_the_lowest_identity_search_would_cull(tmp_path):
+	'''a gene's best contig at 80% is not its best contig at 98%, which a search at 98% reports and -S has to as well'''
+	gene = '1__blaX__blaX_1__1__ResX__ResGANNCBI'
+	geneSeq = 'ATG' + 'GCT' * 99
+	database = tmp_path / 'ar.fasta'
+	database.write_text('>{}\n{}\n'.format(gene, geneSeq))
+	genome = tmp_path / 'genome.fasta'
+	genome.write_text('>contig1\n{0}\n>contig2\n{0}\n'.format(geneSeq))
+	rows = tmp_path / 'rows.tsv'
+	rows.write_text(''.join('\t'.join([gene, contig, pident, '300', '0', '0', '1', '300', '1', '300', '1e-50', bitscore, '300', '300', geneSeq]) + '\n' for contig, pident, bitscore in [('contig1', '85.000', '500.0'), ('contig2', '99.000', '400.0')]))
+	tools = tmp_path / 'bin'
+	tools.mkdir()
+	writeTool(str(tools), 'blastn', FAKE_BLASTN)
+	writeTool(str(tools), 'makeblastdb', FAKE_MAKEBLASTDB)
+	env = dict(os.environ, PATH=str(tools) + os.pathsep + os.environ['PATH'], FAKE_ROWS=str(rows))
+	outdir = tmp_path / 'out'
+	subprocess.check_call([sys.executable, os.path.join(REPO, 'c-SSTAR_gapped.py'), '-d', str(database), '-g', str(genome), '-o', str(outdir), '-s', '80', '-S', '80,98'], env=env, cwd=REPO)
+	reported = {}
+	for sim in [80, 98]:
+		reported[sim] = (outdir / 'genome_{}.sstar'.format(sim)).read_text().splitlines()
+	assert len(reported[80]) == 1 and 'contig1' in reported[80][0].split('\t')
+	assert len(reported[98]) == 1 and 'contig2' in reported[98][0].split('\t')
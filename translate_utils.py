@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+#
+# Description: Table driven translation of nucleotide sequences on raw bytes, shared by c-SSTAR and GAMA so neither needs Biopython to
+#	translate. Handles IUPAC ambiguity codes the way Biopython does
+#
+# Usage: imported only
+#
+# Output location: None
+#
+# Modules required: None (numpy is used when available)
+#
+# v1.0 (10/18/2026)
+#
+# Created by Nick Vlachos (nvx4@cdc.gov)
+#
+
+import itertools
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+# Standard genetic code (NCBI table 1), amino acid of every codon in TCAG order
+BASES = b'TCAG'
+CODON_TABLE = b'FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG'
+
+# IUPAC nucleotide codes and the bases each stands for, U is read as T
+AMBIGUOUS_BASES = [b'T', b'C', b'A', b'G', b'M', b'R', b'W', b'S', b'Y', b'K', b'V', b'H', b'D', b'B', b'N']
+BASE_VALUES = {b'T': b'T', b'C': b'C', b'A': b'A', b'G': b'G', b'M': b'AC', b'R': b'AG', b'W': b'AT', b'S': b'CG', b'Y': b'CT', b'K': b'GT', b'V': b'ACG', b'H': b'ACT', b'D': b'AGT', b'B': b'CGT', b'N': b'ACGT'}
+
+# Ambiguous amino acids given when an ambiguous codon could be either of two residues, anything wider is X
+AMBIGUOUS_RESIDUES = {frozenset(b'DN'): ord('B'), frozenset(b'EQ'): ord('Z'), frozenset(b'IL'): ord('J')}
+
+# Byte to code lookup, 0-14 for the IUPAC codes in either case and 15 for anything else
+INVALID_CODE = 15
+BASE_CODES = bytearray([INVALID_CODE] * 256)
+for code, base in enumerate(AMBIGUOUS_BASES):
+	BASE_CODES[base[0]] = code
+	BASE_CODES[base.lower()[0]] = code
+BASE_CODES[ord('U')] = 0
+BASE_CODES[ord('u')] = 0
+BASE_CODES = bytes(BASE_CODES)
+
+def codonResidue(codon):
+	'''the residue an unambiguous codon of TCAG bases codes for'''
+	return CODON_TABLE[BASES.index(codon[0]) * 16 + BASES.index(codon[1]) * 4 + BASES.index(codon[2])]
+
+def ambiguousResidue(first, second, third):
+	'''the residue a codon of IUPAC codes translates to: a stop if every base it could be is a stop, the amino acid or B/Z/J
+	if every non stop agrees on it, and X otherwise, as Biopython translates them'''
+	residues = set(codonResidue(codon) for codon in itertools.product(BASE_VALUES[first], BASE_VALUES[second], BASE_VALUES[third]))
+	if len(residues) == 1:
+		return residues.pop()
+	if ord('*') in residues:
+		return ord('X')
+	return AMBIGUOUS_RESIDUES.get(frozenset(residues), ord('X'))
+
+# Residue of every codon of base codes, indexed by first * 256 + second * 16 + third code. The 64 TCAG codons are read
+# straight from CODON_TABLE, codons with an invalid byte are 0 so they can be reported
+TRANSLATION_TABLE = bytearray(4096)
+for first, second, third in itertools.product(range(len(AMBIGUOUS_BASES)), repeat=3):
+	TRANSLATION_TABLE[first * 256 + second * 16 + third] = ambiguousResidue(AMBIGUOUS_BASES[first], AMBIGUOUS_BASES[second], AMBIGUOUS_BASES[third])
+TRANSLATION_TABLE = bytes(TRANSLATION_TABLE)
+if np is not None:
+	TRANSLATION_ARRAY = np.frombuffer(TRANSLATION_TABLE, dtype=np.uint8)
+
+def translateBytes(nuclSeq):
+	'''translates a nucleotide sequence (bytes, length a multiple of 3) to protein bytes with * for stops'''
+	codes = nuclSeq.translate(BASE_CODES)
+	if np is None:
+		protein = bytes([TRANSLATION_TABLE[(first << 8) | (second << 4) | third] for first, second, third in zip(codes[0::3], codes[1::3], codes[2::3])])
+	else:
+		codons = np.frombuffer(codes, dtype=np.uint8).astype(np.uint16).reshape(-1, 3)
+		protein = TRANSLATION_ARRAY[(codons[:, 0] << 8) | (codons[:, 1] << 4) | codons[:, 2]].tobytes()
+	if 0 in protein:
+		codon = protein.index(0) * 3
+		raise ValueError('Codon {} is invalid'.format(nuclSeq[codon:codon + 3].decode(errors='replace')))
+	return protein
+
+def translateSeq(nuclSeq):
+	'''takes in a nucleotide sequence (string) and returns a protein sequence (string)'''
+	return translateBytes(nuclSeq.encode()).decode()